@@ -0,0 +1,87 @@
+# Suite of python procedures to analyse and decrypt simple ciphers
+#
+# >>> import cipher_challenge
+# >>> plaintext = cipher_challenge.crypto_tools.decrypt_caesar( ciphertext , shift )
+# >>> from cipher_challenge import decrypt_caesar
+# >>> from cipher_challenge.vigenere import *
+#
+# $ python -m cipher_challenge --help
+#
+# Modules (and the procedures listed in _exports below) are imported
+# only when first used, so importing the package is near-instant and a
+# script or worker only loads the modules it needs.
+
+
+import importlib
+
+
+submodules = ( [ "anytime" , "brute_force" , "composite" , "core" , "crib" , "crypto_tools" , "depth"
+               , "freq_analysis" , "kasiski" , "language_model" , "morse" , "ngram_counts" , "planner"
+               , "polyalphabetic" , "route_transposition" , "running_key" , "transposition"
+               , "trial_and_error" , "vigenere" ] )
+
+# Procedures available directly from the package, by the module they
+# are imported from:
+
+_exports = { "decrypt_caesar" : "crypto_tools"
+           , "decrypt_affine" : "crypto_tools"
+           , "decrypt_with_key" : "crypto_tools"
+           , "load_ciphertext_fom_file" : "crypto_tools"
+           , "decrypt_suggestions" : "freq_analysis"
+           , "k_most_frequent_ngrams" : "freq_analysis"
+           , "solve_affine_shift_eq" : "freq_analysis"
+           , "split_into_ngrams" : "core"
+           , "is_AtoZ_p" : "core"
+           , "rank_tuples_by_second_value" : "core"
+           , "remove_spaces" : "core"
+           , "decrypt_with_partial_key" : "trial_and_error"
+           , "decrypt_transposition_with_perm" : "transposition"
+           , "brute_force_decrypt_transposition" : "brute_force"
+           , "rank_transposition_decryptions" : "brute_force"
+           , "decrypt_vigenere" : "vigenere"
+           , "decrypt_vigenere_batch" : "vigenere"
+           , "load_language_pack" : "language_model"
+           , "build_language_pack" : "language_model"
+           , "composite_decrypt" : "composite"
+           , "solve_substitution_transposition" : "composite"
+           , "solve_double_transposition" : "composite"
+           , "anytime_transposition" : "anytime"
+           , "anytime_periodic" : "anytime"
+           , "plan_transposition" : "planner"
+           , "run_plan" : "planner"
+           , "drag_crib" : "crib"
+           , "solve_periodic" : "polyalphabetic"
+           , "solve_autokey" : "polyalphabetic"
+           , "estimate_key_length" : "polyalphabetic"
+           , "solve_depth" : "depth"
+           , "solve_running_key" : "running_key"
+           , "repeated_substrings" : "kasiski"
+           , "encode_morse" : "morse"
+           , "decode_morse" : "morse"
+           , "decode_unspaced_morse" : "morse"
+           , "encrypt_route" : "route_transposition"
+           , "decrypt_route" : "route_transposition"
+           , "solve_all_routes" : "route_transposition"
+           , "new_ngram_counts" : "ngram_counts"
+           , "count_file" : "ngram_counts" }
+
+
+# Procedure called for any attribute not yet defined on the package,
+# importing the module that provides it:
+
+def __getattr__( name ):
+
+   if name in submodules:
+
+      return importlib.import_module( "." + name , __name__ )
+
+   if name in _exports:
+
+      return getattr( __getattr__( _exports[ name ] ) , name )
+
+   raise AttributeError( "module " + repr( __name__ ) + " has no attribute " + repr( name ) )
+
+
+def __dir__():
+
+   return sorted( set( globals() ) | set( submodules ) | set( _exports ) )
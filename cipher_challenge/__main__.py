@@ -0,0 +1,168 @@
+# Command-line interface to the package
+#
+# $ python -m cipher_challenge suggest ciphertext.txt -n 3
+# $ python -m cipher_challenge caesar ciphertext.txt 7
+# $ python -m cipher_challenge keylength ciphertext.txt --max-k 20
+# $ python -m cipher_challenge periodic ciphertext.txt --cipher beaufort --pack english.pack
+# $ python -m cipher_challenge routes ciphertext.txt --pack english.pack
+# $ python -m cipher_challenge morse stream.txt --pack english.pack
+# $ python -m cipher_challenge build-pack english.pack corpus1.txt corpus2.txt
+#
+# Use "-" as the file name to read the ciphertext from standard input.
+# Newlines are removed from the ciphertext and lowercase letters made
+# uppercase before it is passed on. Each command imports only the
+# modules it needs.
+
+
+import argparse
+
+import sys
+
+import cipher_challenge
+
+
+# Procedure to read a ciphertext from a file (or standard input), as a
+# single uppercase line:
+
+def read_ciphertext( path ):
+
+   if path == "-":
+
+      text = sys.stdin.read()
+
+   else:
+
+      with open( path , "r" ) as f:
+
+         text = f.read()
+
+   return ' '.join( text.split() ).upper()
+
+
+# Procedure to load the language pack named on the command line, if
+# any:
+
+def read_pack( args ):
+
+   if args.pack is None:
+
+      return None
+
+   return cipher_challenge.language_model.load_language_pack( args.pack )
+
+
+def suggest( args ):
+
+   cipher_challenge.freq_analysis.decrypt_suggestions( read_ciphertext( args.file ) , args.n )
+
+
+def caesar( args ):
+
+   cipher_challenge.crypto_tools.decrypt_caesar( read_ciphertext( args.file ) , args.shift )
+
+
+def keylength( args ):
+
+   for k , score in cipher_challenge.polyalphabetic.estimate_key_length(
+                       read_ciphertext( args.file ) , args.max_k , args.cipher ):
+
+      print( str( k ) + "\t" + str( round( score , 4 ) ) )
+
+
+def periodic( args ):
+
+   ciphertext = read_ciphertext( args.file )
+
+   if args.cipher == "autokey":
+
+      ranked_solutions = cipher_challenge.polyalphabetic.solve_autokey( ciphertext , args.max_k
+                                                                      , pack = read_pack( args ) )
+
+   else:
+
+      ranked_solutions = cipher_challenge.polyalphabetic.solve_periodic( ciphertext , args.cipher
+                                                                       , args.max_k
+                                                                       , pack = read_pack( args ) )
+
+   for shifts , plaintext , score in ranked_solutions:
+
+      print( str( shifts ) + "\t" + str( round( score , 2 ) ) + "\n" + plaintext + "\n" )
+
+
+def routes( args ):
+
+   for family , params , plaintext , score in cipher_challenge.route_transposition.solve_all_routes(
+                                                 read_ciphertext( args.file ) , read_pack( args )
+                                                 , n_best = args.n ):
+
+      print( family + " " + str( params ) + "\t" + str( round( score , 2 ) ) + "\n" + plaintext + "\n" )
+
+
+def morse( args ):
+
+   print( cipher_challenge.morse.morse_to_ciphertext( read_ciphertext( args.file )
+                                                    , read_pack( args ) ) )
+
+
+def build_pack( args ):
+
+   cipher_challenge.language_model.build_language_pack( args.corpus , args.pack_path )
+
+   print( "Wrote language pack to " + args.pack_path )
+
+
+def main( argv = None ):
+
+   parser = argparse.ArgumentParser( prog = "python -m cipher_challenge"
+                                   , description = "Analyse and decrypt simple ciphers." )
+
+   commands = parser.add_subparsers( dest = "command" , required = True )
+
+   command = commands.add_parser( "suggest" , help = "frequency analysis and Caesar/affine suggestions" )
+   command.add_argument( "file" )
+   command.add_argument( "-n" , type = int , default = 3 )
+   command.set_defaults( run = suggest )
+
+   command = commands.add_parser( "caesar" , help = "decrypt a Caesar cipher with a given shift" )
+   command.add_argument( "file" )
+   command.add_argument( "shift" , type = int )
+   command.set_defaults( run = caesar )
+
+   command = commands.add_parser( "keylength" , help = "rank putative periodic key lengths" )
+   command.add_argument( "file" )
+   command.add_argument( "--max-k" , type = int , default = 12 )
+   command.add_argument( "--cipher" , default = "vigenere" )
+   command.set_defaults( run = keylength )
+
+   command = commands.add_parser( "periodic" , help = "solve a Vigenere, Beaufort or autokey cipher" )
+   command.add_argument( "file" )
+   command.add_argument( "--max-k" , type = int , default = 12 )
+   command.add_argument( "--cipher" , default = "vigenere"
+                       , choices = [ "vigenere" , "beaufort" , "variant_beaufort" , "autokey" ] )
+   command.add_argument( "--pack" )
+   command.set_defaults( run = periodic )
+
+   command = commands.add_parser( "routes" , help = "solve rail fence, scytale and route ciphers" )
+   command.add_argument( "file" )
+   command.add_argument( "-n" , type = int , default = 5 )
+   command.add_argument( "--pack" )
+   command.set_defaults( run = routes )
+
+   command = commands.add_parser( "morse" , help = "decode Morse code, spaced or unspaced" )
+   command.add_argument( "file" )
+   command.add_argument( "--pack" )
+   command.set_defaults( run = morse )
+
+   command = commands.add_parser( "build-pack" , help = "compile English corpus files into a language pack" )
+   command.add_argument( "pack_path" )
+   command.add_argument( "corpus" , nargs = "+" )
+   command.set_defaults( run = build_pack )
+
+   args = parser.parse_args( argv )
+
+   args.run( args )
+
+
+if __name__ == "__main__":
+
+   main()
@@ -0,0 +1,283 @@
+# Suite of python procedures to run the transposition and periodic
+# cipher solvers within a budget of time or evaluations, returning the
+# best results found so far whenever they are stopped
+#
+# >>> from cipher_challenge.anytime import *
+#
+# new_budget( seconds , evaluations , cancel ) -> budget
+# budget_exhausted( budget ) -> bool
+# anytime_transposition( ciphertext , ngrams_to_count , read_by , budget , key_lengths , top_k ) -> result
+# anytime_periodic( ciphertext , cipher , budget , max_k , pack ) -> result
+#
+# A budget is a dictionary holding an optional time limit in seconds,
+# an optional limit on the number of candidate keys evaluated, and an
+# optional threading.Event: setting the event from another thread
+# (e.g. when a request is withdrawn) stops the search at the next
+# candidate, as running out of time or evaluations does. A budget with
+# none of these runs to completion.
+#
+# The search visits the most promising key lengths first, and a result
+# is a dictionary holding:
+#
+#   "ranked":       the best candidates found so far: for periodic
+#                   ciphers, lists [ shifts , plaintext , score ], best
+#                   first; for transpositions, a ranking for each key
+#                   length visited, in the order visited, of lists
+#                   [ n , perm , count ], best first (counts of
+#                   different lengths are not comparable, as a long
+#                   hill climb fits its key to the ngrams counted)
+#   "coverage":     for each key length visited, a dictionary of the
+#                   method used, the number of keys evaluated, the
+#                   number of keys in the space and whether it was
+#                   searched in full
+#   "evaluations":  the total number of keys evaluated
+#   "elapsed":      the time taken, in seconds
+#   "stopped":      None if the search finished, or else "time",
+#                   "evaluations" or "cancelled"
+#
+# E.g. to give up on a transposition after two seconds, or as soon as
+# another thread calls cancel.set():
+#
+# >>> cancel = threading.Event()
+# >>> result = anytime_transposition( ciphertext , ["THE","TH","ER"] , "column"
+#                                   , new_budget( 2 , cancel = cancel ) )
+
+
+import math
+
+import time
+
+from . import brute_force
+
+from . import polyalphabetic
+
+from .core import remove_spaces
+
+
+# Procedure to create a budget:
+
+def new_budget( seconds = None , evaluations = None , cancel = None ):
+
+   start = time.monotonic()
+
+   return { "start" : start
+          , "deadline" : None if seconds is None else start + seconds
+          , "max_evaluations" : evaluations
+          , "evaluations" : 0
+          , "cancel" : cancel
+          , "stopped" : None }
+
+
+# Procedure to check whether a budget has run out (or been cancelled),
+# recording why:
+
+def budget_exhausted( budget ):
+
+   if budget[ "stopped" ] is None:
+
+      if budget[ "cancel" ] is not None and budget[ "cancel" ].is_set():
+
+         budget[ "stopped" ] = "cancelled"
+
+      elif ( budget[ "max_evaluations" ] is not None
+             and budget[ "evaluations" ] >= budget[ "max_evaluations" ] ):
+
+         budget[ "stopped" ] = "evaluations"
+
+      elif budget[ "deadline" ] is not None and time.monotonic() >= budget[ "deadline" ]:
+
+         budget[ "stopped" ] = "time"
+
+   return budget[ "stopped" ] is not None
+
+
+# Procedure to count an evaluation against a budget and check it:
+
+def spend( budget ):
+
+   budget[ "evaluations" ] += 1
+
+   return budget_exhausted( budget )
+
+
+# Procedure to package the results of a search:
+
+def anytime_result( ranked , coverage , budget ):
+
+   return { "ranked" : ranked
+          , "coverage" : coverage
+          , "evaluations" : budget[ "evaluations" ]
+          , "elapsed" : time.monotonic() - budget[ "start" ]
+          , "stopped" : budget[ "stopped" ] }
+
+
+# Procedure to attack a transposition cipher within a budget. Key
+# lengths (by default every factor of the ciphertext length from 2 to
+# 12) are visited in order of brute_force.column_adjacency_score, best
+# first. Lengths up to max_exhaustive_n are searched in full with
+# brute_force.incremental_transposition_scores, and longer ones by
+# brute_force.hill_climb_transposition. The top_k permutations of
+# each length are kept, as by brute_force_decrypt_transposition:
+
+def anytime_transposition( ciphertext , ngrams_to_count , read_by , budget = None
+                         , key_lengths = None , top_k = 10 , max_exhaustive_n = 8 ):
+
+   if budget is None:
+
+      budget = new_budget()
+
+   n_char = len( remove_spaces( ciphertext ) )
+
+   if key_lengths is None:
+
+      key_lengths = [ n for n in range( 2 , 13 ) if n_char % n == 0 and n < n_char ]
+
+   key_lengths = sorted( key_lengths , reverse = True
+                       , key = lambda n : brute_force.column_adjacency_score( ciphertext
+                                                                            , ngrams_to_count
+                                                                            , n , read_by ) )
+
+   ranked = {}
+
+   coverage = {}
+
+   # Lengths searched by hill climbing are climbed again, in the same
+   # order, for as long as a budget limited by time or evaluations
+   # lasts (a cancel event alone only stops the search early):
+
+   rounds = [ key_lengths ]
+
+   while rounds and not budget_exhausted( budget ):
+
+      climbed = []
+
+      for n in rounds.pop():
+
+         if budget_exhausted( budget ):
+
+            break
+
+         ranked_perms = search_key_length( ciphertext , ngrams_to_count , n , read_by
+                                         , budget , top_k , max_exhaustive_n , coverage )
+
+         if coverage[ n ][ "method" ] == "hill_climb":
+
+            climbed.append( n )
+
+         ranked_n = ranked.setdefault( n , [] )
+
+         ranked_n += [ [ n , perm , count ] for perm , count in ranked_perms
+                       if [ n , perm , count ] not in ranked_n ]
+
+         ranked_n.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+         del ranked_n[ top_k : ]
+
+      if climbed and ( budget[ "deadline" ] is not None
+                       or budget[ "max_evaluations" ] is not None ):
+
+         rounds.append( climbed )
+
+   return anytime_result( list( ranked.values() ) , list( coverage.values() ) , budget )
+
+
+# Procedure to search one key length for anytime_transposition,
+# recording its coverage:
+
+def search_key_length( ciphertext , ngrams_to_count , n , read_by , budget , top_k
+                     , max_exhaustive_n , coverage ):
+
+   total = math.factorial( n )
+
+   start = budget[ "evaluations" ]
+
+   if n <= max_exhaustive_n:
+
+      def scores():
+
+         for entry in brute_force.incremental_transposition_scores( ciphertext
+                                                                   , ngrams_to_count
+                                                                   , n , read_by ):
+
+            yield entry
+
+            if spend( budget ):
+
+               return
+
+      ranked_perms = brute_force.rank_incremental_scores( scores() , top_k )
+
+      method = "exhaustive"
+
+   else:
+
+      ranked_perms , evaluations = brute_force.hill_climb_transposition(
+                                      ciphertext , ngrams_to_count , n , read_by
+                                    , top_k = top_k , stop = lambda : spend( budget ) )
+
+      method = "hill_climb"
+
+   evaluated = budget[ "evaluations" ] - start
+
+   if n in coverage:
+
+      evaluated += coverage[ n ][ "evaluated" ]
+
+   coverage[ n ] = { "n" : n , "method" : method , "evaluated" : evaluated , "total" : total
+                   , "complete" : method == "exhaustive" and evaluated == total }
+
+   return ranked_perms
+
+
+# Procedure to attack a periodic cipher (see polyalphabetic.py) within
+# a budget, visiting key lengths in the order of
+# polyalphabetic.estimate_key_length and solving each in turn; each
+# length counts as 26 evaluations per key position:
+
+def anytime_periodic( ciphertext , cipher , budget = None , max_k = 20 , pack = None ):
+
+   if budget is None:
+
+      budget = new_budget()
+
+   ranked = []
+
+   coverage = []
+
+   seen = []
+
+   for k , score in polyalphabetic.estimate_key_length( ciphertext , max_k , cipher ):
+
+      if budget_exhausted( budget ):
+
+         break
+
+      if cipher == "autokey":
+
+         shifts , chi_squared = polyalphabetic.best_autokey_primer( ciphertext , k , pack )
+
+         plaintext = polyalphabetic.decrypt_autokey( ciphertext , shifts )
+
+      else:
+
+         shifts , chi_squared = polyalphabetic.best_column_shifts( ciphertext , k , cipher , pack )
+
+         shifts = polyalphabetic.minimal_period( shifts )
+
+         plaintext = polyalphabetic.decrypt_periodic( ciphertext , shifts , cipher )
+
+      budget[ "evaluations" ] += 26 * k
+
+      coverage.append( { "n" : k , "method" : "column_shifts" , "evaluated" : 26 * k
+                       , "total" : 26 ** k , "complete" : False } )
+
+      if shifts not in seen:
+
+         seen.append( shifts )
+
+         ranked.append( [ shifts , plaintext
+                        , polyalphabetic.score_plaintext( plaintext , chi_squared , pack ) ] )
+
+         ranked.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return anytime_result( ranked , coverage , budget )
@@ -0,0 +1,1013 @@
+# Suite of python procedures to implement brute force decryption of
+# transposition ciphers
+#
+# >>> from cipher_challenge.brute_force import *
+#
+# brute_force_decrypt_transposition( ciphertext 
+#                                  , ngrams_to_count
+#                                  , read_by ) -> all_ranked_perms
+#
+# rank_transposition_decryptions( ciphertext
+#                               , ngrams_to_count
+#                               , n
+#                               , read_by ) -> ranked_perms
+#
+# NB. Argument read_by = "rows" | "columns"
+# NB. An example list of ngrams_to_count: ["THE", "ER", "TH"]
+#
+# branch_and_bound_transposition( ciphertext
+#                               , ngrams_to_count
+#                               , n
+#                               , read_by
+#                               , top_k ) -> [ ranked_perms , stats ]
+#
+# incremental_transposition_scores( ciphertext
+#                                 , ngrams_to_count
+#                                 , n
+#                                 , read_by ) -> iterator of ( perm , count )
+#
+# hill_climb_transposition( ciphertext
+#                         , ngrams_to_count
+#                         , n
+#                         , read_by ) -> [ ranked_perms , evaluations ]
+#
+# column_adjacency_score( ciphertext , ngrams_to_count , n , read_by ) -> score
+#
+# symmetry_reduced_transposition_scores( ciphertext
+#                                      , ngrams_to_count
+#                                      , n
+#                                      , read_by ) -> iterator of ( perm , count )
+#
+# rotation_class( perm ) -> equivalent_perms
+#
+# rank_irregular_transposition_decryptions( ciphertext
+#                                         , ngrams_to_count
+#                                         , n
+#                                         , read_by
+#                                         , top_k ) -> ranked_perms
+#
+# NB. Optional argument search = "exhaustive" | "pruned" | "incremental"
+# of rank_transposition_decryptions and
+# brute_force_decrypt_transposition selects a full search, a
+# branch-and-bound search for the top_k best permutations, or a full
+# search in which each permutation differs from the last by one swap
+# of two columns and only the ngrams around them are recounted (top_k
+# = None then returns every permutation).
+#
+# count_common_ngrams_in_text( text , ngrams_to_count ) -> count
+# count_ngram_occurance( text , ngram ) -> count
+#
+# Helper procedures are imported from transposition.py and core.py.
+#
+# NB. Ciphertext can have spaces but must not have punctuation or
+# newlines and all letters must be uppercase.
+#
+#
+# Written by Nela Brockington, 9th May 2020, London UK. 
+
+
+# Loading itertools module for permutations functionality:
+
+import itertools
+
+import heapq
+
+import math
+
+import operator
+
+import random
+
+from collections import Counter
+
+from .core import split_into_ngrams , is_AtoZ_p , rank_tuples_by_second_value , remove_spaces
+
+from .transposition import ( decrypt_transposition_with_perm , text_to_ncolumn_matrix_by_row
+                           , text_to_ncolumn_matrix_by_column , decrypt_irregular_transposition
+                           , gather_irregular_columns )
+
+
+# Procedure to attack a transposition cipher by brute force, trying
+# all permutations for all values of n between 2 and 10 that are
+# factors of the ciphertext length, returning a list of top-ranked
+# permutations for each such n: (NB. Recommended ngrams to count are
+# ["TH", "ER", "THE"]; with search = "pruned" only the top_k
+# permutations for each n are found and returned; with irregular =
+# True every n from 2 to 9 is tried, and those that are not factors
+# are searched as irregular transpositions with a short last row)
+
+def brute_force_decrypt_transposition( ciphertext , ngrams_to_count , read_by
+                                     , search = "exhaustive" , top_k = 10
+                                     , irregular = False ):
+
+   n_char = len( remove_spaces( ciphertext ) )
+
+   if irregular:
+
+      poss_key_lengths = [ n for n in range( 2 , 10 ) if n < n_char ]
+
+   else:
+
+      poss_key_lengths = ( list ( filter( ( lambda x: n_char % x == 0 )
+                                          , range( 2 , 10 ) ) ) )
+
+   all_ranked_perms = []
+
+   scored = {}
+
+   for n in poss_key_lengths:
+
+      if n_char % n != 0:
+
+         ranked_perms = rank_irregular_transposition_decryptions( ciphertext
+                                                                , ngrams_to_count
+                                                                , n
+                                                                , read_by
+                                                                , None if search == "exhaustive"
+                                                                  else top_k )
+
+      else:
+
+         ranked_perms = rank_transposition_decryptions( ciphertext
+                                                      , ngrams_to_count
+                                                      , n
+                                                      , read_by
+                                                      , search
+                                                      , top_k
+                                                      , scored )
+
+      print( "Top permutation for key length " + str( n ) + " is "
+            + str( ranked_perms[ 0 ][ 0 ] ) + " with ngram count of "
+            + str( ranked_perms[ 0 ][ 1 ] ) + ".\n\n" )
+
+      all_ranked_perms.append( ranked_perms ) 
+
+   return all_ranked_perms
+
+
+
+# Procedure to rank the results of transposition decryptions under
+# each permutation of the set {1,...,n} (including the identity) by
+# the count of specified ngrams in each, returning a ranked list of
+# permutations and their ngram counts, and printing the text obtained
+# from the top-ranked decryption: (NB. With search = "pruned", only
+# the top_k permutations are found, by branch and bound, and the
+# fraction of the search space pruned is printed; with search =
+# "incremental", the top_k permutations, or all of them if top_k is
+# None, are found by incremental_transposition_scores. Either way the
+# result equals the first top_k entries of the exhaustive ranking. The
+# exhaustive search only decrypts one permutation of each class of
+# equivalent ones, see symmetry_reduced_transposition_scores, and
+# prints how many it decrypted; the dictionary "scored" can be shared
+# between key lengths to reuse the counts of their factors)
+
+def rank_transposition_decryptions( ciphertext 
+                                  , ngrams_to_count 
+                                  , n 
+                                  , read_by
+                                  , search = "exhaustive"
+                                  , top_k = 10
+                                  , scored = None ):
+
+   if search == "pruned":
+
+      ranked_perms , stats = branch_and_bound_transposition( ciphertext
+                                                           , ngrams_to_count
+                                                           , n
+                                                           , read_by
+                                                           , top_k )
+
+      print( "Scored " + str( stats[ "leaves_scored" ] ) + " of "
+             + str( stats[ "total_leaves" ] ) + " permutations ("
+             + str( round( stats[ "fraction_pruned" ] * 100 , 1 ) )
+             + "% pruned)." )
+
+      print( decrypt_transposition_with_perm( ciphertext
+                                            , ranked_perms[ 0 ][ 0 ]
+                                            , read_by ) )
+
+      return ranked_perms
+
+   if search == "incremental":
+
+      ranked_perms = rank_incremental_scores( incremental_transposition_scores( ciphertext
+                                                                              , ngrams_to_count
+                                                                              , n
+                                                                              , read_by )
+                                            , top_k )
+
+      print( decrypt_transposition_with_perm( ciphertext
+                                            , ranked_perms[ 0 ][ 0 ]
+                                            , read_by ) )
+
+      return ranked_perms
+
+   stats = {}
+
+   ranked_perms = rank_incremental_scores( symmetry_reduced_transposition_scores( ciphertext
+                                                                                , ngrams_to_count
+                                                                                , n
+                                                                                , read_by
+                                                                                , scored
+                                                                                , stats )
+                                         , None )
+
+   print( "Decrypted and scored " + str( stats[ "decrypted" ] ) + " of "
+          + str( stats[ "total" ] ) + " permutations (" + str( stats[ "reused" ] )
+          + " more reused from factors of the key length, the rest equivalent"
+          + " under rotation of the column order)." )
+
+   print( decrypt_transposition_with_perm( ciphertext 
+                                         , ranked_perms[ 0 ][ 0 ]
+                                         , read_by ) )
+
+   return ranked_perms
+ 
+
+
+# Procedure to find the top_k permutations of {1,...,n} ranked as in
+# rank_transposition_decryptions, by a depth-first search that fixes
+# the columns of the plaintext matrix one at a time from the left.
+# Each partial plaintext is scored on the ngrams that lie wholly in
+# its fixed columns, and an optimistic bound on the ngrams still to
+# come cuts off any subtree that cannot reach the current top_k.
+# Returns the ranked permutations with their ngram counts and a
+# dictionary of search statistics. (NB. With bound_scale = 1 the bound
+# is admissible and the result equals the first top_k entries of the
+# exhaustive ranking, ties included; a bound_scale below 1 prunes
+# harder but may miss permutations) The optional procedure stop is
+# called at every node and ends the search when it returns True, with
+# stats[ "stopped" ] set and the best permutations found so far:
+
+def branch_and_bound_transposition( ciphertext 
+                                  , ngrams_to_count 
+                                  , n 
+                                  , read_by 
+                                  , top_k 
+                                  , bound_scale = 1
+                                  , stop = None ):
+
+   columns = cipher_matrix_columns( ciphertext , n , read_by )
+
+   n_rows = len( columns[ 0 ] )
+
+   weights = Counter( ngrams_to_count )
+
+   lengths = sorted( set( len( g ) for g in weights if 0 < len( g ) <= n ) )
+
+   # Ngrams longer than a row can only be counted on complete
+   # plaintexts, and are bounded by their number of windows:
+
+   long_lengths = sorted( set( len( g ) for g in weights if len( g ) > n ) )
+
+   long_optimism = sum( max( n_rows * n - L + 1 , 0 )
+                        * max( weights[ g ] for g in weights if len( g ) == L )
+                        for L in long_lengths )
+
+   tables = { L : ngram_window_tables( columns , weights , L ) for L in lengths }
+
+   prefix_maxima = { L : window_prefix_maxima( tables[ L ][ 0 ] ) for L in lengths }
+
+   wrap_optimism = sum( max( table.values() ) for L in lengths
+                        for table in tables[ L ][ 1 : ] )
+
+   best = []
+
+   stats = { "nodes_visited" : 0 , "leaves_scored" : 0 , "stopped" : False }
+
+   order = []
+
+   def best_window( L , prefix , used ):
+
+      for score , rest_mask in prefix_maxima[ L ].get( prefix , () ):
+
+         if not rest_mask & used:
+
+            return score
+
+      return 0
+
+   def bound( score , used ):
+
+      depth = len( order )
+
+      optimism = wrap_optimism + long_optimism
+
+      for L in lengths:
+
+         for s in range( max( depth - L + 1 , 0 ) , min( depth , n - L + 1 ) ):
+
+            optimism += best_window( L , tuple( order[ s : ] ) , used )
+
+         if n - L + 1 > depth:
+
+            optimism += ( n - L + 1 - depth ) * best_window( L , () , used )
+
+      return score + bound_scale * optimism
+
+   def search( score , used ):
+
+      if stats[ "stopped" ] or ( stop is not None and stop() ):
+
+         stats[ "stopped" ] = True
+
+         return
+
+      stats[ "nodes_visited" ] += 1
+
+      depth = len( order )
+
+      if depth == n:
+
+         stats[ "leaves_scored" ] += 1
+
+         for L in lengths:
+
+            for o in range( 1 , L ):
+
+               score += tables[ L ][ o ][ tuple( order[ n - o : ] + order[ : L - o ] ) ]
+
+         if long_lengths:
+
+            wrapped = count_row_wrapping_ngrams( order , columns , weights , long_lengths )
+
+            score += sum( wrapped[ g ] * weights[ g ] for g in wrapped )
+
+         perm = [ 0 ] * n
+
+         for j , c in enumerate( order ):
+
+            perm[ c ] = j + 1
+
+         entry = ( score , tuple( -x for x in perm ) )
+
+         if len( best ) < top_k:
+
+            heapq.heappush( best , entry )
+
+         elif entry > best[ 0 ]:
+
+            heapq.heapreplace( best , entry )
+
+         return
+
+      children = []
+
+      for c in range( n ):
+
+         if not used & ( 1 << c ):
+
+            gain = sum( tables[ L ][ 0 ][ tuple( order[ depth - L + 1 : ] ) + ( c , ) ]
+                        for L in lengths if L <= depth + 1 )
+
+            children.append( ( gain , c ) )
+
+      children.sort( key = lambda x : x[ 0 ] , reverse = True )
+
+      for gain , c in children:
+
+         order.append( c )
+
+         if len( best ) < top_k or bound( score + gain , used | ( 1 << c ) ) >= best[ 0 ][ 0 ]:
+
+            search( score + gain , used | ( 1 << c ) )
+
+         order.pop()
+
+   search( 0 , 0 )
+
+   ranked_perms = ( [ [ [ -x for x in perm ] , score ]
+                    for score , perm in sorted( best , reverse = True ) ] )
+
+   stats[ "total_leaves" ] = math.factorial( n )
+
+   stats[ "pruned_leaves" ] = stats[ "total_leaves" ] - stats[ "leaves_scored" ]
+
+   stats[ "fraction_pruned" ] = stats[ "pruned_leaves" ] / stats[ "total_leaves" ]
+
+   return [ ranked_perms , stats ]
+
+
+# Procedure to generate the swaps of Heap's algorithm, which visits
+# every ordering of n items by swapping one pair of items at a time,
+# as pairs of positions ( i , j ):
+
+def heap_permutation_swaps( n ):
+
+   c = [ 0 ] * n
+
+   i = 1
+
+   while i < n:
+
+      if c[ i ] < i:
+
+         yield ( 0 if i % 2 == 0 else c[ i ] , i )
+
+         c[ i ] += 1
+
+         i = 1
+
+      else:
+
+         c[ i ] = 0
+
+         i += 1
+
+
+# Procedure to list the windows of the plaintext matrix that the
+# count of a plaintext depends on, given its cipher columns: the
+# L-letter windows within a row, and those wrapping from one row into
+# the next, for each length L of the ngrams to count up to n. Returns
+# [ constant , windows ], where windows is a list of ( table ,
+# positions ), so that the count of a plaintext whose columns are in
+# the given order is the constant (the count of single letters, which
+# is the same for every order) plus the sum of table[ columns at
+# positions ] over the windows, as in ngram_window_tables:
+
+def transposition_windows( columns , weights , n ):
+
+   lengths = sorted( set( len( g ) for g in weights if 0 < len( g ) <= n ) )
+
+   constant = 0
+
+   windows = []
+
+   for L in lengths:
+
+      tables = ngram_window_tables( columns , weights , L )
+
+      if L == 1:
+
+         constant += sum( tables[ 0 ].values() )
+
+         continue
+
+      windows += [ ( tables[ 0 ] , tuple( range( s , s + L ) ) ) for s in range( n - L + 1 ) ]
+
+      windows += ( [ ( tables[ o ] , tuple( range( n - o , n ) ) + tuple( range( L - o ) ) )
+                     for o in range( 1 , L ) ] )
+
+   return [ constant , windows ]
+
+
+# Procedure to convert an ordering of the cipher columns (the cipher
+# column in each plaintext column) into the permutation that was used
+# to encrypt, as a tuple:
+
+def order_to_perm( order ):
+
+   perm = [ 0 ] * len( order )
+
+   for j , c in enumerate( order ):
+
+      perm[ c ] = j + 1
+
+   return tuple( perm )
+
+
+# Procedure to make a procedure that counts the ngrams to count in the
+# plaintext of any ordering of the cipher columns, from the window
+# tables, as rank_transposition_decryptions would:
+
+def transposition_scorer( ciphertext , ngrams_to_count , n , read_by ):
+
+   columns = cipher_matrix_columns( ciphertext , n , read_by )
+
+   weights = Counter( ngrams_to_count )
+
+   long_lengths = sorted( set( len( g ) for g in weights if len( g ) > n ) )
+
+   constant , windows = transposition_windows( columns , weights , n )
+
+   getters = [ ( table , operator.itemgetter( *positions ) ) for table , positions in windows ]
+
+   def score( order ):
+
+      count = constant + sum( table[ get( order ) ] for table , get in getters )
+
+      if long_lengths:
+
+         wrapped = count_row_wrapping_ngrams( order , columns , weights , long_lengths )
+
+         count += sum( wrapped[ g ] * weights[ g ] for g in wrapped )
+
+      return count
+
+   return score
+
+
+# Procedure to score every permutation of {1,...,n} as in
+# rank_transposition_decryptions, in the order of Heap's algorithm.
+# After each swap only the windows of transposition_windows that cover
+# either swapped column are looked up again. Yields ( perm , count )
+# pairs, with perm as a tuple:
+
+def incremental_transposition_scores( ciphertext , ngrams_to_count , n , read_by ):
+
+   columns = cipher_matrix_columns( ciphertext , n , read_by )
+
+   weights = Counter( ngrams_to_count )
+
+   long_lengths = sorted( set( len( g ) for g in weights if len( g ) > n ) )
+
+   order = list( range( n ) )
+
+   score , windows = transposition_windows( columns , weights , n )
+
+   getters = [ ( table , operator.itemgetter( *positions ) ) for table , positions in windows ]
+
+   touching = [ set( w for w in range( len( windows ) ) if p in windows[ w ][ 1 ] )
+                for p in range( n ) ]
+
+   affected = { ( i , j ) : [ getters[ w ] for w in sorted( touching[ i ] | touching[ j ] ) ]
+                for i in range( n ) for j in range( i + 1 , n ) }
+
+   score += sum( table[ get( order ) ] for table , get in getters )
+
+   def long_count():
+
+      wrapped = count_row_wrapping_ngrams( order , columns , weights , long_lengths )
+
+      return sum( wrapped[ g ] * weights[ g ] for g in wrapped )
+
+   yield ( order_to_perm( order ) , score + long_count() if long_lengths else score )
+
+   for i , j in heap_permutation_swaps( n ):
+
+      changed = affected[ ( i , j ) ]
+
+      score -= sum( table[ get( order ) ] for table , get in changed )
+
+      order[ i ] , order[ j ] = order[ j ] , order[ i ]
+
+      score += sum( table[ get( order ) ] for table , get in changed )
+
+      yield ( order_to_perm( order ) , score + long_count() if long_lengths else score )
+
+
+# Procedure to search for the best permutations of {1,...,n} by hill
+# climbing, for key lengths too long to search in full. Each climb
+# starts from an ordering of the cipher columns (the identity first,
+# then random ones) and tries random moves, either swapping two
+# columns or moving one column to another place, keeping any move that
+# does not lower the count, until max_failures moves in a row have
+# failed to raise it. The optional procedure stop is called after
+# every evaluation and ends the search when it returns True. Returns
+# [ ranked_perms , evaluations ], with the top_k distinct permutations
+# seen, ranked as in rank_transposition_decryptions:
+
+def hill_climb_transposition( ciphertext , ngrams_to_count , n , read_by , n_restarts = 10
+                            , max_failures = None , top_k = 10 , stop = None ):
+
+   score = transposition_scorer( ciphertext , ngrams_to_count , n , read_by )
+
+   if max_failures is None:
+
+      max_failures = 2 * n * n
+
+   seen = {}
+
+   evaluations = 0
+
+   for restart in range( n_restarts ):
+
+      order = list( range( n ) ) if restart == 0 else random.sample( range( n ) , n )
+
+      current = score( order )
+
+      evaluations += 1
+
+      seen[ order_to_perm( order ) ] = current
+
+      failures = 0
+
+      while failures < max_failures and n > 1:
+
+         if stop is not None and stop():
+
+            return [ rank_incremental_scores( seen.items() , top_k ) , evaluations ]
+
+         i , j = random.sample( range( n ) , 2 )
+
+         candidate = list( order )
+
+         if random.random() < 0.5:
+
+            candidate[ i ] , candidate[ j ] = candidate[ j ] , candidate[ i ]
+
+         else:
+
+            candidate.insert( j , candidate.pop( i ) )
+
+         count = score( candidate )
+
+         evaluations += 1
+
+         seen[ order_to_perm( candidate ) ] = count
+
+         failures = 0 if count > current else failures + 1
+
+         if count >= current:
+
+            order , current = candidate , count
+
+      if len( seen ) > 100 * top_k:
+
+         seen = dict( sorted( seen.items() , key = lambda x : x[ 1 ] , reverse = True )[ : top_k ] )
+
+      if stop is not None and stop():
+
+         break
+
+   return [ rank_incremental_scores( seen.items() , top_k ) , evaluations ]
+
+
+# Procedure to measure cheaply how well the columns of the cipher
+# matrix for key length n fit together, as the average over the
+# columns of the highest count of bigrams (the first two letters of
+# each ngram to count) that the column makes with any other column
+# placed after it, per row. At the right key length some columns
+# follow each other in the plaintext, so this tends to be higher:
+
+def column_adjacency_score( ciphertext , ngrams_to_count , n , read_by ):
+
+   columns = cipher_matrix_columns( ciphertext , n , read_by )
+
+   weights = Counter( g[ : 2 ] for g in ngrams_to_count if len( g ) >= 2 )
+
+   if n < 2 or not weights or not columns[ 0 ]:
+
+      return 0
+
+   table = ngram_window_tables( columns , weights , 2 )[ 0 ]
+
+   best = [ 0 ] * n
+
+   for ( a , b ) , count in table.items():
+
+      best[ a ] = max( best[ a ] , count )
+
+   return sum( best ) / ( n * len( columns[ 0 ] ) )
+
+
+# Procedure to rotate the column order of a permutation by r places,
+# so that plaintext column j of the result is plaintext column j + r
+# (mod n) of the original:
+
+def rotate_perm( perm , r ):
+
+   n = len( perm )
+
+   return [ ( x - 1 - r ) % n + 1 for x in perm ]
+
+
+# Procedure to list the permutations equivalent to perm under rotation
+# of the column order, starting with the canonical representative of
+# the class (the member that puts cipher column 1 in plaintext column
+# 1) followed by its rotations by 1 to n - 1 places:
+
+def rotation_class( perm ):
+
+   return [ rotate_perm( perm , perm[ 0 ] - 1 + r ) for r in range( len( perm ) ) ]
+
+
+# Procedure to tell whether a permutation of {1,...,k} with read_by =
+# "row" decrypts exactly as a permutation of {1,...,d} for some factor
+# d of k already in the dictionary "scored", i.e. whether it permutes
+# each block of d consecutive cipher columns in the same way, within
+# the block. Returns the smaller permutation as a tuple, or None:
+
+def factor_perm( perm , scored ):
+
+   k = len( perm )
+
+   for d in range( 2 , k ):
+
+      if k % d == 0 and tuple( perm[ : d ] ) in scored:
+
+         if all( perm[ c ] == perm[ c % d ] + c - c % d for c in range( d , k ) ):
+
+            return tuple( perm[ : d ] )
+
+   return None
+
+
+# Procedure to score every permutation of {1,...,n} as in
+# rank_transposition_decryptions, yielding ( perm , count ) pairs in
+# no particular order, while decrypting only one permutation of each
+# class of equivalent ones. Rotating the column order rotates every
+# row of the plaintext in the same way, so the members of a class
+# share all their ngrams except those that run across the seam
+# between the end of a row and the start of the next. Only the
+# canonical representative of each class (see rotation_class) is
+# decrypted and counted, and each rotation's count is found from it by
+# swapping the ngram window counts across the seam (as tabulated by
+# ngram_window_tables) for those within the row. With read_by = "row"
+# a representative that repeats a permutation of a factor of n on
+# each block of columns gives the same plaintext as that permutation,
+# so if its count is in the dictionary "scored" (which maps the
+# representatives already counted, as tuples, to their counts) it is
+# reused. The number of permutations decrypted, reused and in total
+# are recorded in the dictionary "stats" if one is given:
+
+def symmetry_reduced_transposition_scores( ciphertext , ngrams_to_count , n , read_by
+                                         , scored = None , stats = None ):
+
+   if scored is None:
+
+      scored = {}
+
+   if stats is None:
+
+      stats = {}
+
+   stats.update( { "decrypted" : 0 , "reused" : 0 , "total" : math.factorial( n ) } )
+
+   columns = cipher_matrix_columns( ciphertext , n , read_by )
+
+   weights = Counter( ngrams_to_count )
+
+   # For each length L of ngram and each o from 1 to L - 1, the change
+   # in count when L columns that sit side by side within a row are
+   # instead split by the seam, o of them ending one row and the rest
+   # starting the next:
+
+   seam_changes = []
+
+   for L in sorted( set( len( g ) for g in weights if 1 < len( g ) <= n ) ):
+
+      tables = ngram_window_tables( columns , weights , L )
+
+      seam_changes += [ ( o , L , { t : tables[ o ][ t ] - tables[ 0 ][ t ] for t in tables[ 0 ] } )
+                        for o in range( 1 , L ) ]
+
+   # Ngrams longer than a row are counted on each decryption:
+
+   long_ngrams = [ g for g in ngrams_to_count if len( g ) > n ]
+
+   def seam( order , r ):
+
+      cycle = order * 3
+
+      return sum( change[ tuple( cycle[ n + r - o : n + r - o + L ] ) ]
+                  for o , L , change in seam_changes )
+
+   for rest in itertools.permutations( range( 2 , n + 1 ) ):
+
+      perm = ( 1 , ) + rest
+
+      factor = factor_perm( perm , scored ) if read_by == "row" else None
+
+      if factor is not None:
+
+         count = scored[ factor ]
+
+         stats[ "reused" ] += 1
+
+      else:
+
+         count = count_common_ngrams_in_text( decrypt_transposition_with_perm( ciphertext
+                                                                             , list( perm )
+                                                                             , read_by )
+                                            , ngrams_to_count )
+
+         stats[ "decrypted" ] += 1
+
+      scored[ perm ] = count
+
+      order = [ 0 ] * n
+
+      for c , x in enumerate( perm ):
+
+         order[ x - 1 ] = c
+
+      base = count - seam( order , 0 )
+
+      if long_ngrams:
+
+         base -= count_common_ngrams_in_text( decrypt_transposition_with_perm( ciphertext
+                                                                             , list( perm )
+                                                                             , read_by )
+                                            , long_ngrams )
+
+      for r in range( n ):
+
+         member = rotate_perm( perm , r )
+
+         count = base + seam( order , r )
+
+         if long_ngrams:
+
+            count += count_common_ngrams_in_text( decrypt_transposition_with_perm( ciphertext
+                                                                                 , member
+                                                                                 , read_by )
+                                                , long_ngrams )
+
+         yield ( tuple( member ) , count )
+
+
+# Procedure to rank ( perm , count ) pairs as in
+# rank_transposition_decryptions (ties in lexicographic order of the
+# permutations), keeping only the top_k unless top_k is None:
+
+def rank_incremental_scores( scores , top_k ):
+
+   if top_k is None:
+
+      ranked = sorted( scores , key = lambda x : x[ 0 ] )
+
+      ranked.sort( key = lambda x : x[ 1 ] , reverse = True )
+
+      return [ [ list( perm ) , count ] for perm , count in ranked ]
+
+   best = []
+
+   for perm , count in scores:
+
+      if len( best ) < top_k:
+
+         heapq.heappush( best , ( count , tuple( -x for x in perm ) ) )
+
+      elif count >= best[ 0 ][ 0 ]:
+
+         heapq.heappushpop( best , ( count , tuple( -x for x in perm ) ) )
+
+   return [ [ [ -x for x in perm ] , count ] for count , perm in sorted( best , reverse = True ) ]
+
+
+# Procedure to rank the decryptions of an irregular transposition
+# cipher (see transposition.py), whose last row is short, under each
+# permutation of {1,...,n} in the same way as
+# rank_transposition_decryptions (keeping only the top_k if top_k is
+# not None). Permutations are taken batch_size at a time; each
+# decryption copies whole cipher columns into place, from column
+# boundaries cached for each set of long columns, and its ngrams are
+# counted in one pass, so a ragged grid costs no more than a full one:
+
+def rank_irregular_transposition_decryptions( ciphertext
+                                            , ngrams_to_count
+                                            , n
+                                            , read_by
+                                            , top_k = None
+                                            , batch_size = 5040 ):
+
+   ciphertext = remove_spaces( ciphertext )
+
+   count = ngram_counter( ngrams_to_count )
+
+   perms = itertools.permutations( range( 1 , n + 1 ) )
+
+   def scores():
+
+      batch = list( itertools.islice( perms , batch_size ) )
+
+      while batch:
+
+         plaintexts = [ ''.join( gather_irregular_columns( ciphertext , perm , read_by ) )
+                        for perm in batch ]
+
+         yield from zip( batch , map( count , plaintexts ) )
+
+         batch = list( itertools.islice( perms , batch_size ) )
+
+   ranked_perms = rank_incremental_scores( scores() , top_k )
+
+   print( decrypt_irregular_transposition( ciphertext , ranked_perms[ 0 ][ 0 ] , read_by ) )
+
+   return ranked_perms
+
+
+# Procedure to make a procedure that counts the ngrams to count in an
+# uppercase text with no spaces, as count_common_ngrams_in_text does,
+# by tallying all its windows of each length at once:
+
+def ngram_counter( ngrams_to_count ):
+
+   weights = Counter( ngrams_to_count )
+
+   lengths = sorted( set( len( g ) for g in weights if len( g ) > 0 ) )
+
+   def count( text ):
+
+      total = 0
+
+      for L in lengths:
+
+         windows = Counter( map( ''.join , zip( *[ text[ i : ] for i in range( L ) ] ) ) )
+
+         total += sum( windows[ g ] * w for g , w in weights.items() if len( g ) == L )
+
+      return total
+
+   return count
+
+
+# Procedure to split a ciphertext into the columns of its (truncated)
+# cipher matrix for key length n, as strings:
+
+def cipher_matrix_columns( ciphertext , n , read_by ):
+
+   ciphertext = remove_spaces( ciphertext )
+
+   if read_by == "row":
+
+      cipher_matrix = text_to_ncolumn_matrix_by_row( ciphertext , n )
+
+   else:
+
+      cipher_matrix = text_to_ncolumn_matrix_by_column( ciphertext , n )
+
+   return [ ''.join( row[ i ] for row in cipher_matrix ) for i in range( n ) ]
+
+
+# Procedure to tabulate the weighted count of length-L ngrams (L no
+# more than the number of columns) for every ordered L-tuple of
+# distinct cipher columns placed side by side in the plaintext matrix.
+# Returns a list of L dictionaries from column tuples to counts: the
+# first for windows lying within a row, and the o-th (o = 1 to L - 1)
+# for windows that take o letters from the end of a row and the rest
+# from the start of the next row:
+
+def ngram_window_tables( columns , weights , L ):
+
+   tables = [ {} for o in range( L ) ]
+
+   for t in itertools.permutations( range( len( columns ) ) , L ):
+
+      cols = [ columns[ c ] for c in t ]
+
+      tables[ 0 ][ t ] = sum( map( weights.__getitem__ , map( ''.join , zip( *cols ) ) ) )
+
+      for o in range( 1 , L ):
+
+         shifted = [ col[ : -1 ] for col in cols[ : o ] ] + [ col[ 1 : ] for col in cols[ o : ] ]
+
+         tables[ o ][ t ] = sum( map( weights.__getitem__ , map( ''.join , zip( *shifted ) ) ) )
+
+   return tables
+
+
+# Procedure to index a table of within-row window counts by every
+# proper prefix of its column tuples, listing for each prefix the
+# counts (highest first) with bitmasks of the remaining columns:
+
+def window_prefix_maxima( table ):
+
+   maxima = {}
+
+   for t , score in table.items():
+
+      for k in range( len( t ) ):
+
+         maxima.setdefault( t[ : k ] , [] ).append( ( score , sum( 1 << c for c in t[ k : ] ) ) )
+
+   for entries in maxima.values():
+
+      entries.sort( key = lambda x : x[ 0 ] , reverse = True )
+
+   return maxima
+
+
+# Procedure to count the ngrams to count that run from the end of one
+# row of the plaintext matrix into the start of the next, given the
+# full ordering of cipher columns:
+
+def count_row_wrapping_ngrams( order , columns , weights , lengths ):
+
+   n = len( order )
+
+   text = ''.join( map( ''.join , zip( *[ columns[ c ] for c in order ] ) ) )
+
+   counts = Counter()
+
+   for L in lengths:
+
+      for start in range( max( n - L + 1 , 0 ) , n ):
+
+         counts.update( w for w in ( text[ p : p + L ]
+                                     for p in range( start , len( text ) - L + 1 , n ) )
+                        if w in weights )
+
+   return counts
+
+
+# Procedure to count the number of occurances of specified ngram(s) in
+# a text, where ngrams are specified as elements of a list in the
+# second argument:
+
+def count_common_ngrams_in_text( text , ngrams_to_count ):
+
+   counts = [ count_ngram_occurance( text , ngram ) for ngram in ngrams_to_count]
+
+   return sum( counts )
+
+
+# Procedure to count the number of occurances of a specific ngram in a
+# text:
+
+def count_ngram_occurance( text , ngram ):
+
+   list_of_ngrams = split_into_ngrams( text , len( ngram ) )
+
+   return list_of_ngrams.count( ngram )
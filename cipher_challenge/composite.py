@@ -0,0 +1,466 @@
+# Suite of python procedures to attack composite ciphers that stack a
+# monoalphabetic substitution with a transposition, or two
+# transpositions
+#
+# >>> from cipher_challenge.composite import *
+#
+# composite_decrypt( ciphertext , layers , cache ) -> plaintext
+# decrypt_substitution( text , key ) -> plaintext
+# letter_chi_squared( text , pack ) -> chi_squared
+# substitution_candidates( ciphertext , family , n_keys , pack ) -> ranked_keys
+# frequency_rank_key( ciphertext , pack ) -> key
+# bigram_coincidence( text ) -> coincidence
+# rank_perms_by_bigram_coincidence( text , n , read_by , top_k ) -> perms
+# improve_substitution_key( text , key , pack ) -> [ key , fitness ]
+#
+# solve_substitution_transposition( ciphertext
+#                                 , key_lengths
+#                                 , read_by
+#                                 , family ) -> ranked_solutions
+#
+# solve_double_transposition( ciphertext
+#                           , outer_key_lengths
+#                           , inner_key_lengths
+#                           , read_by ) -> ranked_solutions
+#
+# NB. Argument family = "caesar" | "affine" | "general"
+#
+# A composite key is a list of layers, applied in decryption order,
+# where each layer is either ( "substitution" , key ) with key as in
+# crypto_tools, or ( "transposition" , perm , read_by ) as in
+# transposition.decrypt_transposition_with_perm. A ranked solution is
+# a list [ layers , score ].
+#
+# A letter-for-letter substitution commutes with a transposition, so
+# the substitution layer can be undone first, whatever order the
+# layers were applied in. Letter frequencies (and the index of
+# coincidence) are unchanged by a transposition, so the substitution
+# layer is solved or narrowed down from them before any transposition
+# is searched. Intermediate texts are cached by the ciphertext and the
+# layers that produced them, so a text shared by many candidates (the ciphertext
+# after one substitution key, or after one outer transposition) is
+# computed once.
+#
+# Scores are quadgram fitness under a loaded language pack (see
+# language_model.py) if one is given, and otherwise the count of
+# ngrams_to_count as in brute_force.py.
+#
+# NB. Ciphertext must be uppercase letters with no punctuation or
+# newlines; spaces are removed. As in brute_force.py, key lengths
+# should divide the length of the text they apply to.
+
+
+import heapq
+
+import itertools
+
+import random
+
+from collections import Counter
+
+from . import brute_force
+
+from . import language_model
+
+from . import transposition
+
+
+# Multiplicative coefficients a for which x -> ax + b (mod 26) is
+# invertible:
+
+affine_multipliers = [ 1 , 3 , 5 , 7 , 9 , 11 , 15 , 17 , 19 , 21 , 23 , 25 ]
+
+
+# Procedure to decrypt a ciphertext through a list of layers, reusing
+# and filling a cache of intermediate texts keyed by the ciphertext and
+# layer prefixes (so one cache can serve several ciphertexts):
+
+def composite_decrypt( ciphertext , layers , cache = None ):
+
+   if cache is None:
+
+      cache = {}
+
+   text = transposition.remove_spaces( ciphertext )
+
+   # Cache keys are prefixes of this list, which starts with the
+   # ciphertext itself:
+
+   layers = [ text ] + [ hashable_layer( layer ) for layer in layers ]
+
+   start = 1
+
+   for i in range( len( layers ) , 1 , -1 ):
+
+      if tuple( layers[ : i ] ) in cache:
+
+         text = cache[ tuple( layers[ : i ] ) ]
+
+         start = i
+
+         break
+
+   for i in range( start , len( layers ) ):
+
+      layer = layers[ i ]
+
+      if layer[ 0 ] == "substitution":
+
+         text = decrypt_substitution( text , list( layer[ 1 ] ) )
+
+      else:
+
+         text = transposition.decrypt_transposition_with_perm( text
+                                                             , list( layer[ 1 ] )
+                                                             , layer[ 2 ] )
+
+      cache[ tuple( layers[ : i + 1 ] ) ] = text
+
+   return text
+
+
+# Procedure to convert a layer into a tuple that can key the cache:
+
+def hashable_layer( layer ):
+
+   return ( layer[ 0 ] , tuple( layer[ 1 ] ) ) + tuple( layer[ 2 : ] )
+
+
+# Procedure to decrypt a text with a full substitution key, without
+# printing (cf. crypto_tools.decrypt_with_key):
+
+def decrypt_substitution( text , key ):
+
+   table = str.maketrans( ''.join( chr( c + 65 ) for c in key )
+                        , ''.join( chr( p + 65 ) for p in range( 26 ) ) )
+
+   return text.translate( table )
+
+
+# Procedure to measure how far the letter frequencies of a text are
+# from those of English by the chi-squared statistic (lower is
+# closer):
+
+def letter_chi_squared( text , pack = None ):
+
+   english = language_model.letter_frequencies( pack )
+
+   n = sum( text.count( chr( i + 65 ) ) for i in range( 26 ) )
+
+   chi_squared = 0
+
+   for i in range( 26 ):
+
+      expected = n * english[ i ] / 100
+
+      if expected > 0:
+
+         chi_squared += ( text.count( chr( i + 65 ) ) - expected ) ** 2 / expected
+
+   return chi_squared
+
+
+# Procedure to rank the keys of a substitution family by how closely
+# the letter frequencies of the decrypted text match English, which
+# no transposition can change, returning up to n_keys [ key ,
+# chi_squared ] pairs: (NB. The "general" family has one candidate,
+# from frequency_rank_key)
+
+def substitution_candidates( ciphertext , family , n_keys , pack = None ):
+
+   ciphertext = transposition.remove_spaces( ciphertext )
+
+   if family == "caesar":
+
+      keys = [ [ ( x + b ) % 26 for x in range( 26 ) ] for b in range( 26 ) ]
+
+   elif family == "affine":
+
+      keys = ( [ [ ( a * x + b ) % 26 for x in range( 26 ) ]
+                 for a in affine_multipliers for b in range( 26 ) ] )
+
+   else:
+
+      keys = [ frequency_rank_key( ciphertext , pack ) ]
+
+   # Only the letter counts matter, so score each key on a permuted
+   # count table rather than a decrypted text:
+
+   counts = [ ciphertext.count( chr( i + 65 ) ) for i in range( 26 ) ]
+
+   english = language_model.letter_frequencies( pack )
+
+   n = sum( counts )
+
+   ranked_keys = []
+
+   for key in keys:
+
+      chi_squared = sum( ( counts[ key[ p ] ] - n * english[ p ] / 100 ) ** 2
+                         / ( n * english[ p ] / 100 )
+                         for p in range( 26 ) if english[ p ] > 0 )
+
+      ranked_keys.append( [ key , chi_squared ] )
+
+   ranked_keys.sort( key = lambda x : x[ 1 ] )
+
+   return ranked_keys[ : n_keys ]
+
+
+# Procedure to build a general substitution key that maps the letters
+# of English, from most to least frequent, onto the letters of the
+# ciphertext from most to least frequent:
+
+def frequency_rank_key( ciphertext , pack = None ):
+
+   english = language_model.letter_frequencies( pack )
+
+   plain_order = sorted( range( 26 ) , key = lambda p : english[ p ] , reverse = True )
+
+   cipher_order = sorted( range( 26 ) , key = lambda c : ciphertext.count( chr( c + 65 ) )
+                        , reverse = True )
+
+   key = [ 0 ] * 26
+
+   for p , c in zip( plain_order , cipher_order ):
+
+      key[ p ] = c
+
+   return key
+
+
+# Procedure to improve a general substitution key for a text that is
+# already in the right order by hill climbing: random pairs of key
+# entries are swapped, keeping each swap that raises the quadgram
+# fitness of the decryption, until max_failures swaps in a row have
+# failed. The climb starts from the given key and is then restarted
+# n_restarts times from random keys, returning the best key found and
+# its fitness:
+
+def improve_substitution_key( text , key , pack , n_restarts = 5
+                            , max_failures = 1000 ):
+
+   best_key = list( key )
+
+   best_fitness = language_model.ngram_fitness( decrypt_substitution( text , best_key )
+                                              , pack )
+
+   for restart in range( n_restarts + 1 ):
+
+      if restart == 0:
+
+         key = list( best_key )
+
+      else:
+
+         key = random.sample( range( 26 ) , 26 )
+
+      fitness = language_model.ngram_fitness( decrypt_substitution( text , key ) , pack )
+
+      failures = 0
+
+      while failures < max_failures:
+
+         i , j = random.sample( range( 26 ) , 2 )
+
+         key[ i ] , key[ j ] = key[ j ] , key[ i ]
+
+         new_fitness = language_model.ngram_fitness( decrypt_substitution( text , key )
+                                                   , pack )
+
+         if new_fitness > fitness:
+
+            fitness = new_fitness
+
+            failures = 0
+
+         else:
+
+            key[ i ] , key[ j ] = key[ j ] , key[ i ]
+
+            failures += 1
+
+      if fitness > best_fitness:
+
+         best_key , best_fitness = list( key ) , fitness
+
+   return [ best_key , best_fitness ]
+
+
+# Procedure to score a decrypted text by quadgram fitness if a pack is
+# given, or else by the count of ngrams_to_count:
+
+def score_text( text , ngrams_to_count , pack ):
+
+   if pack is not None:
+
+      return language_model.ngram_fitness( text , pack )
+
+   return brute_force.count_common_ngrams_in_text( text , ngrams_to_count )
+
+
+# Procedure to measure how much the bigrams of a text repeat, as the
+# chance that two bigrams drawn from it are the same (cf.
+# vigenere.calculate_ioc). This is unchanged by a monoalphabetic
+# substitution, and is far higher for text in its right order than
+# for transposed text:
+
+def bigram_coincidence( text ):
+
+   counts = Counter( zip( text , text[ 1 : ] ) )
+
+   n = len( text ) - 1
+
+   return sum( c * ( c - 1 ) for c in counts.values() ) / max( n * ( n - 1 ) , 1 )
+
+
+# Procedure to rank every permutation of {1,...,n} by the
+# bigram_coincidence of the text it decrypts, returning the top_k
+# permutations:
+
+def rank_perms_by_bigram_coincidence( text , n , read_by , top_k ):
+
+   columns = brute_force.cipher_matrix_columns( text , n , read_by )
+
+   scored = []
+
+   for order in itertools.permutations( range( n ) ):
+
+      plaintext = ''.join( map( ''.join , zip( *[ columns[ c ] for c in order ] ) ) )
+
+      perm = [ 0 ] * n
+
+      for j , c in enumerate( order ):
+
+         perm[ c ] = j + 1
+
+      scored.append( ( bigram_coincidence( plaintext ) , perm ) )
+
+   return [ perm for score , perm in heapq.nlargest( top_k , scored
+                                                   , key = lambda x : x[ 0 ] ) ]
+
+
+# Procedure to attack a substitution followed by a transposition: the
+# n_keys best substitution keys of the family (by letter frequencies)
+# each decrypt the ciphertext once, and the top_k permutations of each
+# key length are then found by branch and bound on the ngram counts of
+# that text. Returns the top_k candidates ranked by score, as [ layers ,
+# score ] pairs. (NB. A general substitution key found from letter
+# frequencies alone is too rough for ngram counts, so for the
+# "general" family the permutations are instead ranked by
+# bigram_coincidence, which no substitution can change, and the key
+# of each candidate is then refined by improve_substitution_key if a
+# pack is given)
+
+def solve_substitution_transposition( ciphertext
+                                    , key_lengths
+                                    , read_by
+                                    , family
+                                    , ngrams_to_count = [ "THE" , "TH" , "ER" ]
+                                    , n_keys = 3
+                                    , top_k = 5
+                                    , pack = None ):
+
+   cache = {}
+
+   ranked_solutions = []
+
+   for key , chi_squared in substitution_candidates( ciphertext , family
+                                                    , n_keys , pack ):
+
+      sub_layer = ( "substitution" , key )
+
+      text = composite_decrypt( ciphertext , [ sub_layer ] , cache )
+
+      for n in key_lengths:
+
+         if family == "general":
+
+            perms = rank_perms_by_bigram_coincidence( text , n , read_by , top_k )
+
+         else:
+
+            ranked_perms , stats = brute_force.branch_and_bound_transposition( text
+                                                                             , ngrams_to_count
+                                                                             , n
+                                                                             , read_by
+                                                                             , top_k )
+
+            perms = [ perm for perm , count in ranked_perms ]
+
+         for perm in perms:
+
+            layers = [ sub_layer , ( "transposition" , perm , read_by ) ]
+
+            if family == "general" and pack is not None:
+
+               untransposed = composite_decrypt( ciphertext , layers[ 1 : ] , cache )
+
+               better_key , fitness = improve_substitution_key( untransposed , key , pack )
+
+               layers = [ ( "substitution" , better_key ) , layers[ 1 ] ]
+
+            plaintext = composite_decrypt( ciphertext , layers , cache )
+
+            ranked_solutions.append( [ layers
+                                     , score_text( plaintext , ngrams_to_count , pack ) ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 1 ] , reverse = True )
+
+   return ranked_solutions[ : top_k ]
+
+
+# Procedure to attack a double transposition: every permutation of
+# each outer key length undoes the last transposition applied, and
+# the text it leaves (computed once and cached) is searched by branch
+# and bound for the top_k permutations of each inner key length.
+# Returns the top_k candidates ranked by score, as [ layers , score ]
+# pairs: (NB. read_by can be a list [ outer_read_by , inner_read_by ]
+# when the two transpositions were read out differently)
+
+def solve_double_transposition( ciphertext
+                              , outer_key_lengths
+                              , inner_key_lengths
+                              , read_by
+                              , ngrams_to_count = [ "THE" , "TH" , "ER" ]
+                              , top_k = 5
+                              , pack = None ):
+
+   if isinstance( read_by , str ):
+
+      read_by = [ read_by , read_by ]
+
+   outer_read_by , inner_read_by = read_by
+
+   cache = {}
+
+   ranked_solutions = []
+
+   for m in outer_key_lengths:
+
+      for outer_perm in itertools.permutations( range( 1 , m + 1 ) ):
+
+         outer_layer = ( "transposition" , list( outer_perm ) , outer_read_by )
+
+         text = composite_decrypt( ciphertext , [ outer_layer ] , cache )
+
+         for n in inner_key_lengths:
+
+            ranked_perms , stats = brute_force.branch_and_bound_transposition( text
+                                                                             , ngrams_to_count
+                                                                             , n
+                                                                             , inner_read_by
+                                                                             , top_k )
+
+            for perm , count in ranked_perms:
+
+               layers = [ outer_layer , ( "transposition" , perm , inner_read_by ) ]
+
+               plaintext = composite_decrypt( ciphertext , layers , cache )
+
+               ranked_solutions.append( [ layers
+                                        , score_text( plaintext , ngrams_to_count , pack ) ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 1 ] , reverse = True )
+
+   return ranked_solutions[ : top_k ]
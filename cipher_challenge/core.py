@@ -0,0 +1,49 @@
+# Suite of python procedures shared by the other modules of the
+# package
+#
+# >>> from cipher_challenge.core import *
+#
+# split_into_ngrams( text , n )            -> list_of_ngrams
+# is_AtoZ_p( char )                        -> bool
+# rank_tuples_by_second_value( list )      -> ranked_tuples
+# remove_spaces( input_text )              -> text
+#
+# These procedures are re-exported by freq_analysis, transposition,
+# vigenere and brute_force, so they can still be imported from there.
+
+
+# Procedure to parse text into a list of its consecutive ngrams:
+
+def split_into_ngrams( text , n ):
+
+   text = ''.join( filter( is_AtoZ_p , text ) )
+
+   list_of_ngrams = ( [ text[ i : i + n ]
+                        for i in range( len( text ) - ( n - 1 ) ) ] )
+
+   return list_of_ngrams;
+
+
+# Predicate to check whether a character is a letter A-Z:
+
+def is_AtoZ_p( char ):
+
+   return ( ord( char ) - 65 ) in range( 26 );
+
+
+# Procedure to rank a list of 2-tuples by the second value of each
+# tuple:
+
+def rank_tuples_by_second_value( list_of_tuples ):
+
+   ranked_tuples = ( sorted( list_of_tuples, key = lambda x: x[ 1 ] ,
+                     reverse = True ) )
+
+   return ranked_tuples;
+
+
+# Procedure to remove spaces in a text:
+
+def remove_spaces( input_text ):
+
+   return input_text.replace( " " , "" )
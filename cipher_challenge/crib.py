@@ -0,0 +1,364 @@
+# Suite of python procedures to attack a ciphertext with a crib, a word
+# or phrase believed to occur somewhere in the plaintext
+#
+# >>> from cipher_challenge.crib import *
+#
+# drag_crib( ciphertext , crib , family , pack , n_best ) -> ranked_hypotheses
+# drag_caesar( ciphertext , crib , pack , n_best ) -> ranked_hypotheses
+# drag_affine( ciphertext , crib , pack , n_best ) -> ranked_hypotheses
+# drag_vigenere( ciphertext , crib , key_lengths , pack , n_best ) -> ranked_hypotheses
+# drag_substitution( ciphertext , crib , partial_key , pack , n_best ) -> ranked_hypotheses
+#
+# NB. Argument family = "caesar" | "affine" | "vigenere" | "substitution"
+#
+# The crib is slid over every position of the ciphertext, and at each
+# offset the key fragment it implies is derived and checked for
+# consistency. A ranked hypothesis is a list [ key , offsets , score ],
+# best first, where the key is in the form the rest of the package
+# takes it:
+#
+#   caesar:        the shift, for crypto_tools.decrypt_caesar
+#   affine:        [ a , b ], for crypto_tools.decrypt_affine
+#   vigenere:      a list of shifts with 26 for the key positions the
+#                  crib does not reach, for vigenere.decrypt_vigenere
+#   substitution:  a partial key in the format of trial_and_error.py
+#                  (26 for letters not yet known), for
+#                  trial_and_error.decrypt_with_partial_key
+#
+# and offsets lists the positions (counting letters only) at which the
+# crib gives that key. Keys that decrypt the whole text are scored by
+# quadgram fitness if a language pack is given (see language_model.py)
+# or else by minus the chi-squared distance of the letter frequencies
+# from English, per letter; partial keys are scored on the letters
+# they decrypt.
+#
+# Consistency is checked for all offsets at once: for each crib letter
+# the ciphertext letters it would sit over, one per offset, are taken
+# as a single slice of the encoded ciphertext, and the key letters
+# they imply are found with one translation of that slice. Offsets are
+# then compared slice against slice, so the number of steps grows with
+# the length of the crib rather than of the ciphertext.
+#
+# NB. Spaces and punctuation are ignored in the ciphertext and crib.
+
+
+import operator
+
+from . import composite
+
+from . import language_model
+
+from . import polyalphabetic
+
+
+# Translation tables from a letter c to c - s (mod 26), for each s:
+
+_minus_tables = [ bytes( ( c - s ) % 26 for c in range( 26 ) ) + bytes( 230 ) for s in range( 26 ) ]
+
+
+# Procedure to take, for each letter of an encoded crib of length m,
+# the slice of the encoded ciphertext that it sits over at each of the
+# len( encoded ) - m + 1 offsets:
+
+def crib_windows( encoded , m ):
+
+   n_offsets = len( encoded ) - m + 1
+
+   return [ encoded[ t : t + n_offsets ] for t in range( m ) ]
+
+
+# Procedure to count, for each offset, how many pairs of slices
+# disagree:
+
+def count_mismatches( pairs , n_offsets ):
+
+   mismatches = [ 0 ] * n_offsets
+
+   for x , y in pairs:
+
+      mismatches = list( map( operator.add , mismatches , map( operator.ne , x , y ) ) )
+
+   return mismatches
+
+
+# Procedure to give, for each crib letter, the slice of shifts c - a p
+# (mod 26) implied at each offset by crib letter p under multiplier a:
+
+def implied_shifts( windows , crib , a = 1 ):
+
+   return [ window.translate( _minus_tables[ ( a * p ) % 26 ] )
+            for window , p in zip( windows , crib ) ]
+
+
+# Procedure to score a full decryption:
+
+def score_decryption( text , pack ):
+
+   if pack is not None:
+
+      return language_model.ngram_fitness( text , pack )
+
+   return -composite.letter_chi_squared( text ) / max( len( text ) , 1 )
+
+
+# Procedure to find the affine keys c = a p + b (mod 26), for each
+# multiplier a in multipliers, under which the crib fits the ciphertext
+# at some offset, and rank them by the score of the full decryption:
+
+def drag_linear( ciphertext , crib , multipliers , pack , n_best ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   text = language_model.decode_text( encoded )
+
+   crib = language_model.encode_text( crib )
+
+   if not crib or len( crib ) > len( encoded ):
+
+      return []
+
+   windows = crib_windows( encoded , len( crib ) )
+
+   offsets = {}
+
+   for a in multipliers:
+
+      shifts = implied_shifts( windows , crib , a )
+
+      mismatches = count_mismatches( [ ( shifts[ 0 ] , s ) for s in shifts[ 1 : ] ]
+                                   , len( windows[ 0 ] ) )
+
+      for i , x in enumerate( mismatches ):
+
+         if x == 0:
+
+            offsets.setdefault( ( a , shifts[ 0 ][ i ] ) , [] ).append( i )
+
+   ranked_hypotheses = []
+
+   for ( a , b ) , key_offsets in offsets.items():
+
+      key = [ ( a * x + b ) % 26 for x in range( 26 ) ]
+
+      ranked_hypotheses.append( [ [ a , b ] , key_offsets
+                                , score_decryption( composite.decrypt_substitution( text , key )
+                                                  , pack ) ] )
+
+   ranked_hypotheses.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return ranked_hypotheses[ : n_best ]
+
+
+# Procedure to drag a crib for a Caesar cipher:
+
+def drag_caesar( ciphertext , crib , pack = None , n_best = 10 ):
+
+   return [ [ key[ 1 ] , offsets , score ]
+            for key , offsets , score in drag_linear( ciphertext , crib , [ 1 ] , pack , n_best ) ]
+
+
+# Procedure to drag a crib for an affine shift cipher:
+
+def drag_affine( ciphertext , crib , pack = None , n_best = 10 ):
+
+   return drag_linear( ciphertext , crib , composite.affine_multipliers , pack , n_best )
+
+
+# Procedure to drag a crib for a Vigenere cipher with each key length
+# in key_lengths. At each offset the crib gives the shifts of the key
+# positions it covers; a crib longer than the key covers some positions
+# twice and must imply the same shift both times. Partial keys are
+# scored on the letters under the key positions they fix:
+
+def drag_vigenere( ciphertext , crib , key_lengths = range( 1 , 13 ) , pack = None , n_best = 10 ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   crib = language_model.encode_text( crib )
+
+   m = len( crib )
+
+   if not crib or m > len( encoded ):
+
+      return []
+
+   windows = crib_windows( encoded , m )
+
+   shifts = implied_shifts( windows , crib )
+
+   keys = {}
+
+   for k in key_lengths:
+
+      mismatches = count_mismatches( [ ( shifts[ t - k ] , shifts[ t ] ) for t in range( k , m ) ]
+                                   , len( windows[ 0 ] ) )
+
+      for i , x in enumerate( mismatches ):
+
+         if x == 0:
+
+            key = [ 26 ] * k
+
+            for t in range( min( k , m ) ):
+
+               key[ ( i + t ) % k ] = shifts[ t ][ i ]
+
+            keys.setdefault( tuple( key ) , [] ).append( i )
+
+   ranked_hypotheses = []
+
+   for key , offsets in keys.items():
+
+      k = len( key )
+
+      known = [ j for j in range( k ) if key[ j ] != 26 ]
+
+      if len( known ) == k:
+
+         text = polyalphabetic.decrypt_periodic( ciphertext , list( key ) , "vigenere" )
+
+         score = score_decryption( text , pack )
+
+      else:
+
+         # Only the letters under known key positions can be decrypted,
+         # so they are scored on their letter frequencies:
+
+         text = ''.join( language_model.decode_text( encoded[ j : : k ].translate(
+                                                          _minus_tables[ key[ j ] ] ) )
+                         for j in known )
+
+         score = -composite.letter_chi_squared( text , pack ) / max( len( text ) , 1 )
+
+      ranked_hypotheses.append( [ list( key ) , offsets , score ] )
+
+   # Full keys are preferred to partial ones, whose scores are not
+   # comparable with them:
+
+   ranked_hypotheses.sort( key = lambda x : ( 26 not in x[ 0 ] or pack is None , x[ 2 ] )
+                         , reverse = True )
+
+   return ranked_hypotheses[ : n_best ]
+
+
+# Procedure to drag a crib for a monoalphabetic substitution cipher,
+# optionally extending a partial key in the format of trial_and_error.py.
+# The crib fits at an offset if the ciphertext repeats a letter exactly
+# where the crib does, agrees with every substitution already in the
+# partial key, and uses no ciphertext letter that the partial key has
+# assigned to another plaintext letter. Hypotheses are scored by how
+# closely the frequency of each ciphertext letter matches that of the
+# plaintext letter it is assigned to:
+
+def drag_substitution( ciphertext , crib , partial_key = None , pack = None , n_best = 10 ):
+
+   if partial_key is None:
+
+      partial_key = [ 26 ] * 26
+
+   encoded = language_model.encode_text( ciphertext )
+
+   crib = language_model.encode_text( crib )
+
+   m = len( crib )
+
+   if not crib or m > len( encoded ):
+
+      return []
+
+   windows = crib_windows( encoded , m )
+
+   n_offsets = len( windows[ 0 ] )
+
+   # The first crib position of each plaintext letter:
+
+   first = {}
+
+   for t , p in enumerate( crib ):
+
+      first.setdefault( p , t )
+
+   pairs = [ ( windows[ first[ p ] ] , windows[ t ] ) for t , p in enumerate( crib ) if first[ p ] != t ]
+
+   representatives = sorted( first.values() )
+
+   mismatches = count_mismatches( pairs , n_offsets )
+
+   # Distinct plaintext letters need distinct ciphertext letters:
+
+   for u in range( len( representatives ) ):
+
+      for v in range( u + 1 , len( representatives ) ):
+
+         mismatches = list( map( operator.add , mismatches
+                                 , map( operator.eq , windows[ representatives[ u ] ]
+                                                    , windows[ representatives[ v ] ] ) ) )
+
+   # Letters already in the partial key:
+
+   used = bytes( 1 if c in partial_key else 0 for c in range( 26 ) ) + bytes( 230 )
+
+   for p , t in first.items():
+
+      if partial_key[ p ] != 26:
+
+         mismatches = list( map( operator.add , mismatches
+                                 , map( operator.ne , windows[ t ]
+                                                    , bytes( [ partial_key[ p ] ] ) * n_offsets ) ) )
+
+      else:
+
+         mismatches = list( map( operator.add , mismatches , windows[ t ].translate( used ) ) )
+
+   english = language_model.letter_frequencies( pack )
+
+   cipher_freq = [ encoded.count( c ) * 100 / len( encoded ) for c in range( 26 ) ]
+
+   keys = {}
+
+   for i , x in enumerate( mismatches ):
+
+      if x == 0:
+
+         key = list( partial_key )
+
+         for p , t in first.items():
+
+            key[ p ] = windows[ t ][ i ]
+
+         keys.setdefault( tuple( key ) , [] ).append( i )
+
+   ranked_hypotheses = []
+
+   for key , offsets in keys.items():
+
+      # Plaintext letters the pack gives no frequency to are left out:
+
+      known = [ p for p in range( 26 ) if key[ p ] != 26 and english[ p ] > 0 ]
+
+      score = -sum( ( cipher_freq[ key[ p ] ] - english[ p ] ) ** 2 / english[ p ] for p in known )
+
+      ranked_hypotheses.append( [ list( key ) , offsets , score ] )
+
+   ranked_hypotheses.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return ranked_hypotheses[ : n_best ]
+
+
+# Procedure to drag a crib for any of the families:
+
+def drag_crib( ciphertext , crib , family , pack = None , n_best = 10 ):
+
+   if family == "caesar":
+
+      return drag_caesar( ciphertext , crib , pack , n_best )
+
+   if family == "affine":
+
+      return drag_affine( ciphertext , crib , pack , n_best )
+
+   if family == "vigenere":
+
+      return drag_vigenere( ciphertext , crib , pack = pack , n_best = n_best )
+
+   return drag_substitution( ciphertext , crib , pack = pack , n_best = n_best )
@@ -1,6 +1,6 @@
 # Suite of python procedures to help crack cipher challenges
 #
-# >>> from crypto_tools import *
+# >>> from cipher_challenge.crypto_tools import *
 #
 # num_key_to_char( num_key ) -> char_key
 # make_caesar_key( shift )   -> caesar_key
@@ -154,7 +154,7 @@ def decrypt_words_sequential_caesar( ciphertext ):
 
   for word in list_of_words:
 
-    decrypted_word = crypto_tools.decrypt_caesar( word , ( count % 26 ) )
+    decrypted_word = decrypt_caesar( word , ( count % 26 ) )
 
     list_of_plaintext_words.append( decrypted_word )
 
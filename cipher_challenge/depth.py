@@ -0,0 +1,197 @@
+# Suite of python procedures to solve many messages enciphered with the
+# same periodic key ("in depth") together
+#
+# >>> from cipher_challenge.depth import *
+#
+# depth_grid( encoded_messages , k , offsets ) -> [ grid , spans ]
+# pooled_column_counts( messages , k , offsets ) -> list_of_counts
+# rank_depth_key_lengths( messages , max_k , offsets ) -> ranked_lengths
+# depth_column_shifts( messages , k , cipher , pack , offsets ) -> [ shifts , chi_squared ]
+# decrypt_depth( messages , key , cipher , offsets ) -> list_of_plaintexts
+# solve_depth( messages , cipher , max_k , n_lengths , pack , offsets ) -> ranked_solutions
+#
+# NB. Argument cipher = "vigenere" | "beaufort" | "variant_beaufort"
+#
+# Messages are a list of ciphertexts. Each is assumed to start at the
+# first letter of the key unless a list of offsets gives the key
+# position (counting from 0) of its first letter. A short message on
+# its own has too few letters under each key position for the index of
+# coincidence or frequency analysis to work, but the letters under one
+# key position in every message were all enciphered by the same key
+# letter, so their counts can be pooled.
+#
+# For a key length k, the messages are laid out together as one grid
+# of (messages x rows) x k letters, each message padded at either end
+# to whole rows of the key, so that grid[ m : : k ] holds every letter
+# under key position m. Pooling, key length estimation and decryption
+# then take k slices of the whole grid, whatever the number of
+# messages, and letters are handled as in polyalphabetic.py
+# (integer-encoded, A-Z only, output uppercase).
+#
+# A ranked solution is a list [ key , plaintexts , score ], with the
+# key as a list of shifts and a plaintext for each message.
+
+
+from . import language_model
+
+from . import polyalphabetic
+
+
+# Encoded value used to pad the grid (it is not a letter, so it is not
+# counted and is left as it is by the tableaux):
+
+_padding = 26
+
+
+# Procedure to lay out encoded messages as a grid with k columns, one
+# per key position, returning [ grid , spans ] where spans lists the
+# ( start , stop ) of each message in the grid:
+
+def depth_grid( encoded_messages , k , offsets = None ):
+
+   if offsets is None:
+
+      offsets = [ 0 ] * len( encoded_messages )
+
+   pieces = []
+
+   spans = []
+
+   start = 0
+
+   for encoded , offset in zip( encoded_messages , offsets ):
+
+      before = offset % k
+
+      after = -( before + len( encoded ) ) % k
+
+      pieces += [ bytes( [ _padding ] ) * before , encoded , bytes( [ _padding ] ) * after ]
+
+      spans.append( ( start + before , start + before + len( encoded ) ) )
+
+      start += before + len( encoded ) + after
+
+   return [ b''.join( pieces ) , spans ]
+
+
+# Procedure to count the letters under each key position of a key of
+# length k across all the messages:
+
+def pooled_column_counts( messages , k , offsets = None ):
+
+   grid , spans = depth_grid( [ language_model.encode_text( m ) for m in messages ] , k , offsets )
+
+   return [ polyalphabetic.letter_counts( grid[ m : : k ] ) for m in range( k ) ]
+
+
+# Procedure to rank putative key lengths 1 to max_k, best first, by how
+# close the average index of coincidence of the pooled letters under
+# each key position is to that of English (cf.
+# polyalphabetic.rank_key_lengths), returning ( k , average_ioc )
+# pairs:
+
+def rank_depth_key_lengths( messages , max_k , offsets = None ):
+
+   encoded_messages = [ language_model.encode_text( m ) for m in messages ]
+
+   ranked = []
+
+   for k in range( 1 , max_k + 1 ):
+
+      grid , spans = depth_grid( encoded_messages , k , offsets )
+
+      ranked.append( ( k , sum( polyalphabetic.ioc_from_counts(
+                                   polyalphabetic.letter_counts( grid[ m : : k ] ) )
+                                for m in range( k ) ) / k ) )
+
+   return sorted( ranked , key = lambda x : abs( x[ 1 ] - polyalphabetic.english_ioc ) )
+
+
+# Procedure to find the most likely shift for each key position from
+# the pooled letter counts, returning [ shifts , total_chi_squared ]:
+
+def depth_column_shifts( messages , k , cipher = "vigenere" , pack = None , offsets = None ):
+
+   english = language_model.letter_frequencies( pack )
+
+   shifts = []
+
+   total = 0
+
+   for counts in pooled_column_counts( messages , k , offsets ):
+
+      # A key position no letter falls under (only padding) keeps
+      # shift 0 and adds nothing to the total:
+
+      if sum( counts ) == 0:
+
+         shifts.append( 0 )
+
+         continue
+
+      shift , chi_squared = polyalphabetic.best_shift_for_counts( counts , cipher , english )
+
+      shifts.append( shift )
+
+      total += chi_squared
+
+   return [ shifts , total ]
+
+
+# Procedure to decrypt every message with the same key, translating
+# the letters under each key position in all the messages at once:
+
+def decrypt_depth( messages , key , cipher = "vigenere" , offsets = None ):
+
+   shifts = polyalphabetic.key_to_shifts( key )
+
+   grid , spans = depth_grid( [ language_model.encode_text( m ) for m in messages ]
+                            , len( shifts ) , offsets )
+
+   tableau = polyalphabetic.decrypt_tableaux[ cipher ]
+
+   decrypted = polyalphabetic.apply_periodic_tables( grid , [ tableau[ s ] for s in shifts ] )
+
+   return [ language_model.decode_text( decrypted[ start : stop ] ) for start , stop in spans ]
+
+
+# Procedure to solve messages in depth: the n_lengths best key lengths
+# from rank_depth_key_lengths are each given their most likely shifts
+# from the pooled counts, and the decryptions are returned ranked by
+# score (quadgram fitness summed over the messages if a pack is given,
+# or else minus the total chi-squared), best first:
+
+def solve_depth( messages , cipher = "vigenere" , max_k = 12 , n_lengths = 3 , pack = None
+               , offsets = None ):
+
+   ranked_solutions = []
+
+   seen = []
+
+   for k , ioc in rank_depth_key_lengths( messages , max_k , offsets )[ : n_lengths ]:
+
+      shifts , chi_squared = depth_column_shifts( messages , k , cipher , pack , offsets )
+
+      shifts = polyalphabetic.minimal_period( shifts )
+
+      if shifts in seen:
+
+         continue
+
+      seen.append( shifts )
+
+      plaintexts = decrypt_depth( messages , shifts , cipher , offsets )
+
+      if pack is not None:
+
+         score = sum( language_model.ngram_fitness( p , pack ) for p in plaintexts )
+
+      else:
+
+         score = -chi_squared
+
+      ranked_solutions.append( [ shifts , plaintexts , score ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return ranked_solutions
@@ -1,6 +1,6 @@
 # Suite of python procedures to analyse a ciphertext
 #
-# >>> from freq_analysis import *
+# >>> from cipher_challenge.freq_analysis import *
 #
 # decrypt_suggestions( ciphertext , n )    -> frequencies
 # get_first_elems_of_tuples( tup_list )    -> list_of_elements
@@ -13,6 +13,9 @@
 # Written by Nela Brockington, 13th April 2020, London UK.
 
 
+from .core import split_into_ngrams , is_AtoZ_p , rank_tuples_by_second_value
+
+
 # Procedure to suggest up to n decryption strategies for a ciphertext
 # based on letter, bigram and trigram frequency analyses:
 
@@ -171,37 +174,3 @@ def k_most_frequent_ngrams( text , n , k ):
 
    return ranked_ngrams[ : k ];
 
-
-   
-# Procedure to parse text into a list of its consecutive ngrams:
-
-def split_into_ngrams( text , n ):
-
-   text = ''.join( filter( is_AtoZ_p , text ) )
-
-   list_of_ngrams = ( [ text[ i : i + n ] 
-                        for i in range( len( text ) - ( n - 1 ) ) ] )
-
-   return list_of_ngrams;
-
-
-
-# Predicate to check whether a character is a letter A-Z:
-
-def is_AtoZ_p( char ):
-
-   return ( ord( char ) - 65 ) in range( 26 );
-
-
-
-# Procedure to rank a list of 2-tuples by the second value of each tuple:
-
-def rank_tuples_by_second_value( list_of_tuples ):
-
-   ranked_tuples = ( sorted( list_of_tuples, key = lambda x: x[ 1 ] ,
-                     reverse = True ) )
-
-   return ranked_tuples;
-
-
-
@@ -0,0 +1,236 @@
+# Suite of python procedures to carry out a Kasiski examination of a
+# ciphertext: finding its repeated substrings and the distances between
+# them to suggest the key length of a periodic cipher
+#
+# >>> from cipher_challenge.kasiski import *
+#
+# suffix_array( encoded ) -> suffix_array
+# lcp_array( encoded , suffix_array ) -> lcp_array
+# repeated_substrings( ciphertext , min_length ) -> list_of_repeats
+# repeat_distances( ciphertext , min_length ) -> list_of_distances
+# factor_histogram( distances , max_k ) -> histogram
+# rank_kasiski_lengths( ciphertext , max_k , min_length ) -> ranked_lengths
+#
+# In a Vigenere (or Beaufort) cipher a stretch of plaintext that
+# recurs a multiple of the key length later is enciphered the same way
+# both times, so the distances between repeated substrings of the
+# ciphertext tend to be multiples of the key length.
+#
+# All repeats are found at once from the suffix array of the
+# integer-encoded ciphertext (see language_model.py), the start
+# positions of its suffixes in alphabetical order, and its LCP array,
+# the length of the common prefix of each suffix with the one before it
+# in that order. Suffixes that start with the same min_length letters
+# are adjacent in the suffix array, in a run whose LCPs are all at
+# least min_length.
+#
+# A repeat is a list [ substring , positions ]. Each repeat is counted
+# once in the distances however long it is: a distance is only taken
+# between two occurrences that cannot be extended to the left.
+#
+# NB. Only the letters A-Z of the ciphertext are kept (lowercase
+# letters are counted as uppercase), as in polyalphabetic.py.
+
+
+from . import language_model
+
+
+# Procedure to build the suffix array of an encoded text by prefix
+# doubling: the suffixes are sorted by their first letter, then by
+# their first 2, 4, 8, ... letters, using the ranks from the previous
+# round, until every suffix has a rank of its own:
+
+def suffix_array( encoded ):
+
+   n = len( encoded )
+
+   rank = list( encoded )
+
+   order = list( range( n ) )
+
+   k = 1
+
+   while n > 1:
+
+      keys = [ ( rank[ i ] , rank[ i + k ] if i + k < n else -1 ) for i in range( n ) ]
+
+      order.sort( key = keys.__getitem__ )
+
+      new_rank = [ 0 ] * n
+
+      for r in range( 1 , n ):
+
+         new_rank[ order[ r ] ] = new_rank[ order[ r - 1 ] ] + ( keys[ order[ r ] ] != keys[ order[ r - 1 ] ] )
+
+      rank = new_rank
+
+      if rank[ order[ -1 ] ] == n - 1:
+
+         break
+
+      k *= 2
+
+   return order
+
+
+# Procedure to build the LCP array of an encoded text from its suffix
+# array by Kasai's algorithm, in linear time: the common prefix of a
+# suffix with its predecessor is at most one letter shorter than that
+# of the suffix one position to its left:
+
+def lcp_array( encoded , sa ):
+
+   n = len( encoded )
+
+   rank = [ 0 ] * n
+
+   for r , i in enumerate( sa ):
+
+      rank[ i ] = r
+
+   lcp = [ 0 ] * n
+
+   h = 0
+
+   for i in range( n ):
+
+      if rank[ i ] == 0:
+
+         h = 0
+
+         continue
+
+      j = sa[ rank[ i ] - 1 ]
+
+      while i + h < n and j + h < n and encoded[ i + h ] == encoded[ j + h ]:
+
+         h += 1
+
+      lcp[ rank[ i ] ] = h
+
+      if h > 0:
+
+         h -= 1
+
+   return lcp
+
+
+# Procedure to list the groups of start positions, in text order, of
+# the suffixes sharing their first min_length letters:
+
+def repeat_groups( encoded , min_length ):
+
+   sa = suffix_array( encoded )
+
+   lcp = lcp_array( encoded , sa )
+
+   groups = []
+
+   r = 1
+
+   while r < len( sa ):
+
+      if lcp[ r ] < min_length:
+
+         r += 1
+
+         continue
+
+      start = r - 1
+
+      while r < len( sa ) and lcp[ r ] >= min_length:
+
+         r += 1
+
+      groups.append( sorted( sa[ start : r ] ) )
+
+   return groups
+
+
+# Procedure to list the pairs ( i , j , length ) of consecutive
+# occurrences of a repeat that cannot be extended to the left, with
+# the length of the repeat:
+
+def repeat_pairs( encoded , min_length ):
+
+   pairs = []
+
+   for positions in repeat_groups( encoded , min_length ):
+
+      for i , j in zip( positions , positions[ 1 : ] ):
+
+         if i > 0 and encoded[ i - 1 ] == encoded[ j - 1 ]:
+
+            continue
+
+         length = min_length
+
+         while j + length < len( encoded ) and encoded[ i + length ] == encoded[ j + length ]:
+
+            length += 1
+
+         pairs.append( ( i , j , length ) )
+
+   return pairs
+
+
+# Procedure to list the repeated substrings of at least min_length
+# letters of a ciphertext, longest first, as [ substring , positions ]:
+
+def repeated_substrings( ciphertext , min_length = 3 ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   repeats = {}
+
+   for i , j , length in repeat_pairs( encoded , min_length ):
+
+      substring = language_model.decode_text( encoded[ i : i + length ] )
+
+      repeats.setdefault( substring , set() ).update( [ i , j ] )
+
+   list_of_repeats = [ [ substring , sorted( positions ) ]
+                       for substring , positions in repeats.items() ]
+
+   list_of_repeats.sort( key = lambda x : ( len( x[ 0 ] ) , len( x[ 1 ] ) ) , reverse = True )
+
+   return list_of_repeats
+
+
+# Procedure to list the distances between consecutive occurrences of
+# the repeated substrings of a ciphertext:
+
+def repeat_distances( ciphertext , min_length = 3 ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   return [ j - i for i , j , length in repeat_pairs( encoded , min_length ) ]
+
+
+# Procedure to count, for each putative key length 2 to max_k, how many
+# of the distances it divides:
+
+def factor_histogram( distances , max_k ):
+
+   return { k : sum( 1 for d in distances if d % k == 0 ) for k in range( 2 , max_k + 1 ) }
+
+
+# Procedure to rank putative key lengths 2 to max_k, best first,
+# returning ( k , score ) pairs. A random distance is divisible by k
+# one time in k, so the score is the fraction of distances divisible by
+# k less 1 / k; this also keeps the factors of the key length from
+# outranking it:
+
+def rank_kasiski_lengths( ciphertext , max_k , min_length = 3 ):
+
+   distances = repeat_distances( ciphertext , min_length )
+
+   histogram = factor_histogram( distances , max_k )
+
+   if not distances:
+
+      return [ ( k , 0 ) for k in histogram ]
+
+   ranked = [ ( k , count / len( distances ) - 1 / k ) for k , count in histogram.items() ]
+
+   return sorted( ranked , key = lambda x : x[ 1 ] , reverse = True )
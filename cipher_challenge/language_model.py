@@ -0,0 +1,406 @@
+# Suite of python procedures to build and load a compact binary
+# English language-model data pack
+#
+# >>> from cipher_challenge.language_model import *
+#
+# build_language_pack( corpus_paths , pack_path ) -> pack_path
+# load_language_pack( pack_path ) -> pack
+# encode_text( text ) -> encoded_text
+# decode_text( encoded_text ) -> text
+# ngram_index( encoded_ngram ) -> index
+# ngram_fitness( text , pack , n ) -> log_probability
+# letter_frequencies( pack ) -> letter_freq
+#
+# From the command line:
+#
+#   python -m cipher_challenge.language_model english.pack corpus1.txt corpus2.txt ...
+#
+# A pack holds log10-probabilities of every unigram, bigram, trigram
+# and quadgram of the letters A-Z as dense float32 arrays (indexed in
+# base 26, so "THE" is at index 19 * 26 * 26 + 7 * 26 + 4), the
+# percentage frequency of each letter, and a ranked list of common
+# words with their log10-probabilities. As in split_into_ngrams, all
+# non-letters are stripped from the corpus before ngrams are counted.
+#
+# The pack is memory-mapped rather than parsed when loaded, so that
+# loading is near-instant and processes that load the same pack share
+# one physical copy of the tables through the page cache. A loaded
+# pack is a dictionary whose "unigrams", "bigrams", "trigrams",
+# "quadgrams", "letter_freq" and "word_logp" entries are read-only
+# float views that index like lists.
+#
+# File layout (all integers little-endian):
+#
+#   magic "CIPHERLM" | version (uint32) | number of sections (uint32)
+#   per section: name (16 bytes) | offset (uint64) | length (uint64)
+#   section data, each aligned to 8 bytes
+#
+# Encoded text is a bytes object holding the numbers 0 to 25 for the
+# letters A to Z, the same numbering used by keys in crypto_tools.
+
+
+import math
+
+import mmap
+
+import os
+
+import struct
+
+import sys
+
+from array import array
+
+from collections import Counter
+
+
+pack_magic = b"CIPHERLM"
+
+pack_version = 1
+
+pack_sections = ( [ "unigrams" , "bigrams" , "trigrams" , "quadgrams"
+                  , "letter_freq" , "word_logp" , "words" ] )
+
+float_sections = pack_sections[ : -1 ]
+
+default_pack_path = os.environ.get( "CIPHER_LANGUAGE_PACK" ,
+                                    os.path.join( os.path.dirname(
+                                       os.path.abspath( __file__ ) )
+                                                , "english.pack" ) )
+
+
+# Translation table and deletion set to encode uppercase letters as
+# numbers 0-25, dropping everything else:
+
+_encode_table = bytes( ( b - 65 ) % 256 for b in range( 256 ) )
+
+_non_letters = bytes( b for b in range( 256 ) if b not in range( 65 , 91 ) )
+
+_decode_table = bytes( ( b + 65 ) % 256 for b in range( 256 ) )
+
+
+# Translation table that turns everything but the letters A-Z into
+# spaces, used to split a corpus into words:
+
+_word_separator_table = bytes( ( b if b in range( 65 , 91 ) else 32 )
+                               for b in range( 256 ) )
+
+
+# Standard percentage frequencies of the letters A-Z in English text,
+# used by letter_frequencies when no pack is given:
+
+english_letter_freq = ( [ 8.2 , 1.5 , 2.8 , 4.3 , 12.7 , 2.2 , 2.0 , 6.1 , 7.0 ,
+                          0.15 , 0.77 , 4.0 , 2.4 , 6.7 , 7.5 , 1.9 , 0.095 ,
+                          6.0 , 6.3 , 9.1 , 2.8 , 0.98 , 2.4 , 0.15 , 2.0 ,
+                          0.074 ] )
+
+
+# Packs already loaded by this process, by absolute path:
+
+_loaded_packs = {}
+
+
+# Procedure to encode the letters of a text as a bytes object of
+# numbers 0-25, dropping spaces, punctuation and newlines (lowercase
+# letters are treated as uppercase):
+
+def encode_text( text ):
+
+   if isinstance( text , str ):
+
+      text = text.upper().encode( "ascii" , "ignore" )
+
+   return text.translate( _encode_table , _non_letters )
+
+
+# Procedure to convert an encoded text back into uppercase letters:
+
+def decode_text( encoded_text ):
+
+   return bytes( encoded_text ).translate( _decode_table ).decode( "ascii" )
+
+
+# Procedure to compute the position of an encoded ngram in the dense
+# table for ngrams of its length:
+
+def ngram_index( encoded_ngram ):
+
+   index = 0
+
+   for x in encoded_ngram:
+
+      index = index * 26 + x
+
+   return index
+
+
+# Procedure to sum the log10-probabilities of the consecutive n-grams
+# (n = 1 to 4) of a text under a loaded pack, so that higher (less
+# negative) values indicate more English-like text:
+
+def ngram_fitness( text , pack , n = 4 ):
+
+   e = encode_text( text )
+
+   table = pack[ float_sections[ n - 1 ] ]
+
+   if n == 1:
+
+      return sum( map( table.__getitem__ , e ) )
+
+   if n == 2:
+
+      indices = map( lambda a , b : a * 26 + b , e , e[ 1 : ] )
+
+   elif n == 3:
+
+      indices = map( lambda a , b , c : ( a * 26 + b ) * 26 + c
+                   , e , e[ 1 : ] , e[ 2 : ] )
+
+   else:
+
+      indices = map( lambda a , b , c , d : ( ( a * 26 + b ) * 26 + c ) * 26 + d
+                   , e , e[ 1 : ] , e[ 2 : ] , e[ 3 : ] )
+
+   return sum( map( table.__getitem__ , indices ) )
+
+
+# Procedure to return the percentage frequencies of the letters A-Z
+# from a loaded pack, or standard English frequencies if pack is None:
+
+def letter_frequencies( pack = None ):
+
+   if pack is None:
+
+      return english_letter_freq
+
+   return list( pack[ "letter_freq" ] )
+
+
+# Procedure to count the n-grams (n = 1 to 4) of an encoded text into
+# a dense list of 26^n counts:
+
+def count_encoded_ngrams( encoded_text , n ):
+
+   shifted = [ encoded_text[ i : ] for i in range( n ) ]
+
+   counts = [ 0 ] * ( 26 ** n )
+
+   for index , count in Counter( map( lambda *x : ngram_index( x )
+                                    , *shifted ) ).items():
+
+      counts[ index ] = count
+
+   return counts
+
+
+# Procedure to convert a list of counts into log10-probabilities,
+# giving unseen entries a floor of a hundredth of a single
+# occurrence:
+
+def counts_to_log_probs( counts ):
+
+   total = max( sum( counts ) , 1 )
+
+   floor = math.log10( 0.01 / total )
+
+   return [ ( math.log10( c / total ) if c else floor ) for c in counts ]
+
+
+# Procedure to compile plain-text corpus files into a binary pack,
+# keeping the n_words most common words:
+
+def build_language_pack( corpus_paths , pack_path , n_words = 5000 ):
+
+   letters = bytearray()
+
+   word_counts = Counter()
+
+   for path in corpus_paths:
+
+      with open( path , "rb" ) as f:
+
+         raw = f.read().upper()
+
+      letters += raw.translate( _encode_table , _non_letters )
+
+      word_counts.update( raw.translate( None , b"'" ).translate(
+                             _word_separator_table ).split() )
+
+   letters = bytes( letters )
+
+   if len( letters ) < 4:
+
+      raise ValueError( "Corpus contains fewer than four letters." )
+
+   unigram_counts = count_encoded_ngrams( letters , 1 )
+
+   sections = {}
+
+   sections[ "unigrams" ] = counts_to_log_probs( unigram_counts )
+
+   for n in range( 2 , 5 ):
+
+      sections[ float_sections[ n - 1 ] ] = ( counts_to_log_probs(
+                                  count_encoded_ngrams( letters , n ) ) )
+
+   sections[ "letter_freq" ] = ( [ c * 100 / len( letters )
+                                  for c in unigram_counts ] )
+
+   ranked_words = word_counts.most_common( n_words )
+
+   sections[ "word_logp" ] = ( counts_to_log_probs(
+                                 [ c for w , c in ranked_words ] ) )
+
+   sections[ "words" ] = b"\n".join( w for w , c in ranked_words )
+
+   write_language_pack( sections , pack_path )
+
+   return pack_path
+
+
+# Procedure to write a dictionary of pack sections to a file in the
+# binary pack layout:
+
+def write_language_pack( sections , pack_path ):
+
+   header_size = 16 + 32 * len( pack_sections )
+
+   blobs = []
+
+   for name in pack_sections:
+
+      if name in float_sections:
+
+         data = array( "f" , sections[ name ] )
+
+         if sys.byteorder != "little":
+
+            data.byteswap()
+
+         blobs.append( data.tobytes() )
+
+      else:
+
+         blobs.append( bytes( sections[ name ] ) )
+
+   header = [ pack_magic , struct.pack( "<II" , pack_version
+                                       , len( pack_sections ) ) ]
+
+   offset = _align( header_size )
+
+   offsets = []
+
+   for name , blob in zip( pack_sections , blobs ):
+
+      header.append( struct.pack( "<16sQQ" , name.encode( "ascii" )
+                                , offset , len( blob ) ) )
+
+      offsets.append( offset )
+
+      offset = _align( offset + len( blob ) )
+
+   tmp_path = pack_path + ".tmp"
+
+   with open( tmp_path , "wb" ) as f:
+
+      f.write( b"".join( header ) )
+
+      for start , blob in zip( offsets , blobs ):
+
+         f.write( b"\0" * ( start - f.tell() ) )
+
+         f.write( blob )
+
+   os.replace( tmp_path , pack_path )
+
+   return pack_path
+
+
+def _align( offset ):
+
+   return ( offset + 7 ) // 8 * 8
+
+
+# Procedure to memory-map a pack and return its tables, reusing any
+# pack already loaded from the same path by this process:
+
+def load_language_pack( pack_path = None ):
+
+   if pack_path is None:
+
+      pack_path = default_pack_path
+
+   pack_path = os.path.abspath( pack_path )
+
+   if pack_path in _loaded_packs:
+
+      return _loaded_packs[ pack_path ]
+
+   if not os.path.exists( pack_path ):
+
+      raise FileNotFoundError( "No language pack at " + pack_path
+                               + "; build one with: python -m cipher_challenge.language_model "
+                               + pack_path + " corpus.txt" )
+
+   with open( pack_path , "rb" ) as f:
+
+      buf = mmap.mmap( f.fileno() , 0 , access = mmap.ACCESS_READ )
+
+   if buf[ : 8 ] != pack_magic:
+
+      raise ValueError( pack_path + " is not a language pack." )
+
+   version , n_sections = struct.unpack_from( "<II" , buf , 8 )
+
+   if version != pack_version:
+
+      raise ValueError( pack_path + " has pack version " + str( version )
+                        + " but version " + str( pack_version )
+                        + " is required; rebuild it." )
+
+   view = memoryview( buf )
+
+   pack = { "path" : pack_path , "version" : version , "mmap" : buf }
+
+   for i in range( n_sections ):
+
+      name , offset , length = struct.unpack_from( "<16sQQ" , buf , 16 + 32 * i )
+
+      name = name.rstrip( b"\0" ).decode( "ascii" )
+
+      data = view[ offset : offset + length ]
+
+      if name == "words":
+
+         pack[ name ] = bytes( data ).decode( "ascii" ).split( "\n" )
+
+      elif sys.byteorder == "little":
+
+         pack[ name ] = data.cast( "f" )
+
+      else:
+
+         swapped = array( "f" , data.tobytes() )
+
+         swapped.byteswap()
+
+         pack[ name ] = swapped
+
+   _loaded_packs[ pack_path ] = pack
+
+   return pack
+
+
+
+if __name__ == "__main__":
+
+   if len( sys.argv ) < 3:
+
+      print( "Usage: python -m cipher_challenge.language_model PACK_PATH CORPUS.txt [CORPUS.txt ...]" )
+
+      sys.exit( 1 )
+
+   build_language_pack( sys.argv[ 2 : ] , sys.argv[ 1 ] )
+
+   print( "Wrote language pack to " + sys.argv[ 1 ] )
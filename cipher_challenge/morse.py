@@ -0,0 +1,312 @@
+# Suite of python procedures to translate Morse code, including Morse
+# streams whose letter separators are missing
+#
+# >>> from cipher_challenge.morse import *
+#
+# encode_morse( text ) -> morse
+# decode_morse( morse ) -> text
+# decode_unspaced_morse( stream , pack , n_best , shift , order , beam ) -> ranked_segmentations
+# morse_to_ciphertext( morse , pack ) -> text
+# solve_morse_caesar( stream , pack ) -> [ shift , ciphertext , plaintext ]
+#
+# Well-formed Morse separates letters by spaces and words by " / " (or
+# by three or more spaces), e.g. ".... .. / - .... . .-. ." for "HI
+# THERE". Dots and dashes may also be written as "·" and "_" or "−".
+#
+# An unspaced stream such as "......-...." has many readings ("HI
+# THERE" could also be read as "EEEEEEE..."), so it is decoded by
+# dynamic programming over a prefix tree of the letter codes: at every
+# position of the stream the best readings up to it are extended by
+# each letter whose code starts there, scored by English ngram
+# log-probabilities from a language pack (see language_model.py), or
+# by single-letter frequencies if no pack is given. Up to n_best
+# readings are kept for each position and context (the last letters
+# that the next letter's probability depends on), which yields the
+# n_best segmentations of the whole stream. A ranked
+# segmentation is a list [ text , log_probability ].
+#
+# Decoded text is uppercase, with spaces between words where the
+# Morse had them, so it can be passed straight to the procedures of
+# freq_analysis and crypto_tools.
+
+
+import heapq
+
+import math
+
+from . import crypto_tools
+
+from . import language_model
+
+
+morse_code = { "A" : ".-" , "B" : "-..." , "C" : "-.-." , "D" : "-.." , "E" : "."
+             , "F" : "..-." , "G" : "--." , "H" : "...." , "I" : ".." , "J" : ".---"
+             , "K" : "-.-" , "L" : ".-.." , "M" : "--" , "N" : "-." , "O" : "---"
+             , "P" : ".--." , "Q" : "--.-" , "R" : ".-." , "S" : "..." , "T" : "-"
+             , "U" : "..-" , "V" : "...-" , "W" : ".--" , "X" : "-..-" , "Y" : "-.--"
+             , "Z" : "--.." , "0" : "-----" , "1" : ".----" , "2" : "..---"
+             , "3" : "...--" , "4" : "....-" , "5" : "....." , "6" : "-...."
+             , "7" : "--..." , "8" : "---.." , "9" : "----." }
+
+morse_decode_table = { code : char for char , code in morse_code.items() }
+
+
+# Translation table for encoding: each character becomes its code and
+# a space, and a space between words becomes "/ ":
+
+_encode_table = str.maketrans( dict( [ ( c , code + " " ) for c , code in morse_code.items() ]
+                                     + [ ( c.lower() , code + " " )
+                                         for c , code in morse_code.items() if c.isalpha() ]
+                                     + [ ( " " , "/ " ) ] ) )
+
+_symbol_table = str.maketrans( { "·" : "." , "•" : "." , "_" : "-" , "−" : "-" , "–" : "-" } )
+
+
+# Prefix tree of the codes of the letters A-Z: each node is a
+# dictionary from "." and "-" to child nodes, holding under "letter"
+# the number 0-25 of the letter whose code ends there:
+
+def make_morse_trie():
+
+   trie = {}
+
+   for char , code in morse_code.items():
+
+      if char.isalpha():
+
+         node = trie
+
+         for symbol in code:
+
+            node = node.setdefault( symbol , {} )
+
+         node[ "letter" ] = ord( char ) - 65
+
+   return trie
+
+
+morse_trie = make_morse_trie()
+
+
+# Procedure to encode a text in Morse code, dropping characters that
+# have no code:
+
+def encode_morse( text ):
+
+   morse = ' '.join( text.split() ).translate( _encode_table )
+
+   return ''.join( c for c in morse if c in ".-/ " ).strip()
+
+
+# Procedure to decode well-formed Morse code, writing "?" for any
+# unknown code:
+
+def decode_morse( morse ):
+
+   morse = morse.translate( _symbol_table ).replace( "/" , "   " )
+
+   words = [ w.split() for w in morse.split( "   " ) ]
+
+   return ' '.join( ''.join( morse_decode_table.get( code , "?" ) for code in word )
+                    for word in words if word )
+
+
+# Procedure to give the log-probability of letter b following the
+# context letters (a tuple of up to three letters numbered 0-25) under
+# a pack's ngram tables, or under English letter frequencies alone if
+# pack is None. A context never seen in the corpus carries no
+# information, so it is shortened from the left until it has been
+# seen. Letters x are scored as the English letters x - shift, for
+# streams that carry a Caesar-shifted text:
+
+def letter_log_prob( pack , context , b , shift = 0 ):
+
+   letters = [ ( x - shift ) % 26 for x in context + ( b , ) ]
+
+   if pack is None:
+
+      return math.log10( language_model.english_letter_freq[ letters[ -1 ] ] / 100 )
+
+   tables = [ pack[ name ] for name in language_model.float_sections[ : 4 ] ]
+
+   if pack[ "path" ] not in _unseen_log_probs:
+
+      _unseen_log_probs[ pack[ "path" ] ] = [ min( table ) for table in tables ]
+
+   unseen = _unseen_log_probs[ pack[ "path" ] ]
+
+   while len( letters ) > 1:
+
+      context_log_prob = tables[ len( letters ) - 2 ][ language_model.ngram_index( letters[ : -1 ] ) ]
+
+      if context_log_prob > unseen[ len( letters ) - 2 ]:
+
+         return ( tables[ len( letters ) - 1 ][ language_model.ngram_index( letters ) ]
+                  - context_log_prob )
+
+      letters = letters[ 1 : ]
+
+   return tables[ 0 ][ letters[ 0 ] ]
+
+
+# The log-probability given to unseen ngrams of each length, by pack
+# path:
+
+_unseen_log_probs = {}
+
+
+# Procedure to decode a stream of dots and dashes with no separators
+# into its n_best readings as letters, best first. Readings are scored
+# by ngrams of up to "order" letters (1 to 4), and only the best
+# "beam" readings up to each position are extended:
+
+def decode_unspaced_morse( stream , pack = None , n_best = 5 , shift = 0
+                         , order = 4 , beam = 300 ):
+
+   stream = ''.join( c for c in stream.translate( _symbol_table ) if c in ".-" )
+
+   if pack is None:
+
+      order = 1
+
+   n = len( stream )
+
+   log_probs = {}
+
+   # hypotheses[ i ] maps the context (the last order - 1 letters) of
+   # readings of stream[ : i ] to up to n_best entries ( score ,
+   # previous position , previous context , previous rank , letter ),
+   # best first:
+
+   hypotheses = [ {} for i in range( n + 1 ) ]
+
+   hypotheses[ 0 ][ () ] = [ ( 0 , None , None , None , None ) ]
+
+   for i in range( n ):
+
+      if not hypotheses[ i ]:
+
+         continue
+
+      # Candidates are only trimmed once they exceed n_best, so each
+      # list is put in order before its entries are pruned or extended:
+
+      for entries in hypotheses[ i ].values():
+
+         entries.sort( key = lambda x : x[ 0 ] , reverse = True )
+
+      if sum( len( entries ) for entries in hypotheses[ i ].values() ) > beam:
+
+         kept = heapq.nlargest( beam , ( ( entry[ 0 ] , context )
+                                         for context , entries in hypotheses[ i ].items()
+                                         for entry in entries ) )
+
+         cutoff = kept[ -1 ][ 0 ]
+
+         hypotheses[ i ] = { context : [ e for e in entries if e[ 0 ] >= cutoff ]
+                             for context , entries in hypotheses[ i ].items()
+                             if entries[ 0 ][ 0 ] >= cutoff }
+
+      node = morse_trie
+
+      j = i
+
+      while j < n and stream[ j ] in node:
+
+         node = node[ stream[ j ] ]
+
+         j += 1
+
+         if "letter" not in node:
+
+            continue
+
+         b = node[ "letter" ]
+
+         for context , entries in hypotheses[ i ].items():
+
+            if ( context , b ) not in log_probs:
+
+               log_probs[ ( context , b ) ] = letter_log_prob( pack , context , b , shift )
+
+            step = log_probs[ ( context , b ) ]
+
+            new_context = ( context + ( b , ) )[ 1 - order : ] if order > 1 else ()
+
+            candidates = hypotheses[ j ].setdefault( new_context , [] )
+
+            for rank , entry in enumerate( entries ):
+
+               candidates.append( ( entry[ 0 ] + step , i , context , rank , b ) )
+
+            if len( candidates ) > n_best:
+
+               candidates.sort( key = lambda x : x[ 0 ] , reverse = True )
+
+               del candidates[ n_best : ]
+
+   for entries in hypotheses[ n ].values():
+
+      entries.sort( key = lambda x : x[ 0 ] , reverse = True )
+
+   finals = heapq.nlargest( n_best , ( ( entry[ 0 ] , context , rank )
+                                       for context , entries in hypotheses[ n ].items()
+                                       for rank , entry in enumerate( entries ) )
+                          , key = lambda x : x[ 0 ] )
+
+   ranked_segmentations = []
+
+   for score , context , rank in finals:
+
+      letters = []
+
+      i = n
+
+      while i:
+
+         entry = hypotheses[ i ][ context ][ rank ]
+
+         letters.append( chr( entry[ 4 ] + 65 ) )
+
+         i , context , rank = entry[ 1 : 4 ]
+
+      ranked_segmentations.append( [ ''.join( reversed( letters ) ) , score ] )
+
+   return ranked_segmentations
+
+
+# Procedure to turn Morse code into text for the other procedures:
+# well-formed Morse is decoded directly, and a stream with no spaces
+# is decoded to its best reading:
+
+def morse_to_ciphertext( morse , pack = None ):
+
+   morse = morse.strip()
+
+   if " " in morse or "/" in morse:
+
+      return decode_morse( morse )
+
+   return decode_unspaced_morse( morse , pack , 1 )[ 0 ][ 0 ]
+
+
+# Procedure to solve an unspaced Morse stream that carries a Caesar
+# cipher: the stream is decoded under a letter model shifted by each
+# possible Caesar shift, and the best reading overall is decrypted
+# with crypto_tools.decrypt_caesar:
+
+def solve_morse_caesar( stream , pack = None ):
+
+   best = None
+
+   for shift in range( 26 ):
+
+      ciphertext , score = decode_unspaced_morse( stream , pack , 1 , shift )[ 0 ]
+
+      if best is None or score > best[ 2 ]:
+
+         best = [ shift , ciphertext , score ]
+
+   shift , ciphertext , score = best
+
+   return [ shift , ciphertext , crypto_tools.decrypt_caesar( ciphertext , shift ) ]
@@ -0,0 +1,498 @@
+# Suite of python procedures to gather ngram and word frequency
+# profiles over text too large to hold in memory, in chunks and across
+# many processes
+#
+# >>> from cipher_challenge.ngram_counts import *
+#
+# new_ngram_counts( max_dense_n , sketch_orders , width , depth , n_heavy ) -> counts
+# update_ngram_counts( counts , chunk ) -> counts
+# finish_ngram_counts( counts ) -> counts
+# count_file( path , counts , chunk_size ) -> counts
+# merge_ngram_counts( counts , other_counts ) -> counts
+# save_ngram_counts( counts , path ) -> path
+# load_ngram_counts( path ) -> counts
+# estimate_count( counts , n , ngram ) -> count
+# ranked_ngrams( counts , n , k ) -> k_ranked_ngrams
+# ranked_words( counts , k ) -> k_ranked_words
+#
+# A counts structure is a dictionary holding:
+#
+#   exact counts of every ngram for n = 1 to max_dense_n (default 3),
+#   as dense arrays of 26^n counts indexed as in language_model.py;
+#
+#   for each higher order n in sketch_orders, and for words (the
+#   order "words"), a Count-Min sketch (depth rows of width counters,
+#   each ngram adding to one counter per row, so that the smallest of
+#   its counters bounds its count from above) together with up to
+#   n_heavy heavy hitters, the most frequent ngrams seen so far;
+#
+#   the totals for each order, and the last letters (and any
+#   unfinished word) of the text so far, so that ngrams and words
+#   running across the boundary between two chunks are still counted.
+#
+# The unfinished word is only counted once the text is known to have
+# ended, by finish_ngram_counts, which count_file calls at the end of
+# each file. A structure saved part way through a text keeps its
+# unfinished word, and merging counts the other structure's unfinished
+# word as a word (its text ends at the boundary).
+#
+# Memory is therefore bounded, whatever the amount of text. Counts are
+# updated from one chunk of text at a time, and structures built by
+# different workers (with the same settings) can be merged, map-reduce
+# style, and saved to and loaded from disk. Ranked output is a list of
+# ( ngram , percentage ) pairs in the same form as
+# freq_analysis.k_most_frequent_ngrams, ranked as there by their
+# rounded percentages. Ngrams of equal percentage are in alphabetical
+# order (k_most_frequent_ngrams leaves them in no set order). As there,
+# ngrams run across spaces and punctuation; lowercase letters are
+# counted as uppercase.
+#
+# NB. Two structures can only be merged if they were gathered from
+# separate texts (or separate parts of one text); ngrams across the
+# boundary between the parts are not counted.
+
+
+import hashlib
+
+import json
+
+import operator
+
+import struct
+
+import sys
+
+from array import array
+
+from collections import Counter
+
+from . import language_model
+
+from .core import rank_tuples_by_second_value
+
+
+counts_magic = b"CIPHNGC1"
+
+# Prime modulus and per-row multipliers and increments of the sketch
+# hash functions, fixed so that sketches from different processes
+# agree:
+
+_hash_prime = 2 ** 61 - 1
+
+_hash_rows = ( [ ( 0x9E3779B97F4A7C15 % _hash_prime , 0x632BE59BD9B4E019 % _hash_prime )
+               , ( 0xC2B2AE3D27D4EB4F % _hash_prime , 0x165667B19E3779F9 % _hash_prime )
+               , ( 0x27D4EB2F165667C5 % _hash_prime , 0x85EBCA77C2B2AE63 % _hash_prime )
+               , ( 0xFF51AFD7ED558CCD % _hash_prime , 0xC4CEB9FE1A85EC53 % _hash_prime )
+               , ( 0x94D049BB133111EB % _hash_prime , 0xBF58476D1CE4E5B9 % _hash_prime )
+               , ( 0xD6E8FEB86659FD93 % _hash_prime , 0xA0761D6478BD642F % _hash_prime )
+               , ( 0xE7037ED1A0B428DB % _hash_prime , 0x8EBC6AF09C88C6E3 % _hash_prime )
+               , ( 0x589965CC75374CC3 % _hash_prime , 0x1D8E4E27C47D124F % _hash_prime ) ] )
+
+_word_separator_table = bytes( ( b if b in range( 65 , 91 ) else 32 ) for b in range( 256 ) )
+
+
+# Procedure to create an empty counts structure:
+
+def new_ngram_counts( max_dense_n = 3 , sketch_orders = [ 4 , 5 ] , width = 2 ** 16
+                    , depth = 4 , n_heavy = 1000 ):
+
+   depth = min( depth , len( _hash_rows ) )
+
+   sketch_orders = [ n for n in sketch_orders if n > max_dense_n ] + [ "words" ]
+
+   return { "max_dense_n" : max_dense_n
+          , "sketch_orders" : sketch_orders
+          , "width" : width
+          , "depth" : depth
+          , "n_heavy" : n_heavy
+          , "dense" : { n : array( "Q" , bytes( 8 * 26 ** n ) )
+                        for n in range( 1 , max_dense_n + 1 ) }
+          , "sketches" : { order : [ array( "Q" , bytes( 8 * width ) ) for r in range( depth ) ]
+                           for order in sketch_orders }
+          , "heavy" : { order : {} for order in sketch_orders }
+          , "totals" : { order : 0 for order in list( range( 1 , max_dense_n + 1 ) )
+                                                + sketch_orders }
+          , "tail" : b""
+          , "word_tail" : b"" }
+
+
+# Procedure to give the longest order of ngram counted:
+
+def max_order( counts ):
+
+   return max( [ counts[ "max_dense_n" ] ]
+               + [ n for n in counts[ "sketch_orders" ] if n != "words" ] )
+
+
+# Procedure to compute the sketch counter of each row for an integer
+# key:
+
+def sketch_cells( counts , key ):
+
+   return [ ( ( a * key + b ) % _hash_prime ) % counts[ "width" ]
+            for a , b in _hash_rows[ : counts[ "depth" ] ] ]
+
+
+# Procedure to turn a word into an integer sketch key:
+
+def word_key( word ):
+
+   return int.from_bytes( hashlib.blake2b( word , digest_size = 8 ).digest() , "little" )
+
+
+# Procedure to read the count of an integer key from a sketch:
+
+def sketch_estimate( counts , order , key ):
+
+   rows = counts[ "sketches" ][ order ]
+
+   return min( row[ cell ] for row , cell in zip( rows , sketch_cells( counts , key ) ) )
+
+
+# Procedure to add a Counter of keys to a sketch and refresh its heavy
+# hitters, which are stored by name (ngram or word string):
+
+def add_to_sketch( counts , order , key_counts , names ):
+
+   rows = counts[ "sketches" ][ order ]
+
+   heavy = counts[ "heavy" ][ order ]
+
+   for key , c in key_counts.items():
+
+      for row , cell in zip( rows , sketch_cells( counts , key ) ):
+
+         row[ cell ] += c
+
+   for key in key_counts:
+
+      heavy[ names( key ) ] = sketch_estimate( counts , order , key )
+
+   prune_heavy_hitters( counts , order )
+
+
+# Procedure to keep only the n_heavy largest heavy hitters of an
+# order:
+
+def prune_heavy_hitters( counts , order ):
+
+   heavy = counts[ "heavy" ][ order ]
+
+   if len( heavy ) > counts[ "n_heavy" ]:
+
+      kept = sorted( heavy.items() , key = lambda x : x[ 1 ] , reverse = True )
+
+      counts[ "heavy" ][ order ] = dict( kept[ : counts[ "n_heavy" ] ] )
+
+
+# Procedure to count the ngrams of every order in an encoded text that
+# end at or after position "start":
+
+def count_encoded_windows( encoded , n , start ):
+
+   first = max( start - n + 1 , 0 )
+
+   shifted = [ encoded[ first + i : ] for i in range( n ) ]
+
+   windows = Counter( zip( *shifted ) )
+
+   return Counter( { language_model.ngram_index( ngram ) : c for ngram , c in windows.items() } )
+
+
+# Procedure to add one chunk of text to a counts structure:
+
+def update_ngram_counts( counts , chunk ):
+
+   if isinstance( chunk , str ):
+
+      chunk = chunk.upper().encode( "ascii" , "ignore" )
+
+   else:
+
+      chunk = chunk.upper()
+
+   encoded = counts[ "tail" ] + language_model.encode_text( chunk )
+
+   start = len( counts[ "tail" ] )
+
+   for n in range( 1 , counts[ "max_dense_n" ] + 1 ):
+
+      dense = counts[ "dense" ][ n ]
+
+      windows = count_encoded_windows( encoded , n , start )
+
+      for index , c in windows.items():
+
+         dense[ index ] += c
+
+      counts[ "totals" ][ n ] += sum( windows.values() )
+
+   for n in counts[ "sketch_orders" ]:
+
+      if n != "words":
+
+         windows = count_encoded_windows( encoded , n , start )
+
+         add_to_sketch( counts , n , windows
+                      , lambda key , n = n : index_to_ngram( key , n ) )
+
+         counts[ "totals" ][ n ] += sum( windows.values() )
+
+   counts[ "tail" ] = encoded[ len( encoded ) - max_order( counts ) + 1 : ] if max_order( counts ) > 1 else b""
+
+   # A word at the end of the chunk may continue in the next chunk:
+
+   words = ( counts[ "word_tail" ] + chunk.translate( None , b"'" ) ).translate(
+                                                       _word_separator_table ).split( b" " )
+
+   counts[ "word_tail" ] = words.pop()
+
+   add_words( counts , words )
+
+   return counts
+
+
+# Procedure to add a list of words (as uppercase bytes, any empty ones
+# ignored) to the word sketch:
+
+def add_words( counts , words ):
+
+   word_counts = Counter( w for w in words if w )
+
+   keys = { word_key( w ) : w for w in word_counts }
+
+   add_to_sketch( counts , "words" , Counter( { word_key( w ) : c for w , c in word_counts.items() } )
+                , lambda key : keys[ key ].decode( "ascii" ) )
+
+   counts[ "totals" ][ "words" ] += sum( word_counts.values() )
+
+
+# Procedure to mark the end of a text: its unfinished word is counted,
+# and neither it nor the last letters are carried into the next chunk:
+
+def finish_ngram_counts( counts ):
+
+   add_words( counts , [ counts[ "word_tail" ] ] )
+
+   counts[ "tail" ] = b""
+
+   counts[ "word_tail" ] = b""
+
+   return counts
+
+
+# Procedure to count a whole file, reading chunk_size bytes at a time,
+# as a text of its own:
+
+def count_file( path , counts = None , chunk_size = 2 ** 20 ):
+
+   if counts is None:
+
+      counts = new_ngram_counts()
+
+   with open( path , "rb" ) as f:
+
+      chunk = f.read( chunk_size )
+
+      while chunk:
+
+         update_ngram_counts( counts , chunk )
+
+         chunk = f.read( chunk_size )
+
+   return finish_ngram_counts( counts )
+
+
+# Procedure to convert a dense index back into an ngram:
+
+def index_to_ngram( index , n ):
+
+   letters = []
+
+   for i in range( n ):
+
+      letters.append( chr( index % 26 + 65 ) )
+
+      index //= 26
+
+   return ''.join( reversed( letters ) )
+
+
+# Procedure to merge a counts structure gathered by another worker into
+# this one, counting the other's unfinished word (this one's is kept,
+# as its text may go on):
+
+def merge_ngram_counts( counts , other_counts ):
+
+   for setting in [ "max_dense_n" , "sketch_orders" , "width" , "depth" ]:
+
+      if counts[ setting ] != other_counts[ setting ]:
+
+         raise ValueError( "Cannot merge ngram counts with different " + setting + "." )
+
+   for n , dense in counts[ "dense" ].items():
+
+      dense[ : ] = array( "Q" , map( operator.add , dense , other_counts[ "dense" ][ n ] ) )
+
+   for order , rows in counts[ "sketches" ].items():
+
+      for row , other in zip( rows , other_counts[ "sketches" ][ order ] ):
+
+         row[ : ] = array( "Q" , map( operator.add , row , other ) )
+
+      heavy = counts[ "heavy" ][ order ]
+
+      for name in list( heavy ) + list( other_counts[ "heavy" ][ order ] ):
+
+         heavy[ name ] = estimate_count( counts , order , name )
+
+      prune_heavy_hitters( counts , order )
+
+   for order in counts[ "totals" ]:
+
+      counts[ "totals" ][ order ] += other_counts[ "totals" ][ order ]
+
+   add_words( counts , [ other_counts[ "word_tail" ] ] )
+
+   return counts
+
+
+# Procedure to give the count of an ngram (or, for order "words", of a
+# word): exact for orders up to max_dense_n, and otherwise an
+# over-estimate from the sketch:
+
+def estimate_count( counts , n , ngram ):
+
+   ngram = ngram.upper()
+
+   if n == "words":
+
+      return sketch_estimate( counts , n , word_key( ngram.encode( "ascii" ) ) )
+
+   index = language_model.ngram_index( language_model.encode_text( ngram ) )
+
+   if n <= counts[ "max_dense_n" ]:
+
+      return counts[ "dense" ][ n ][ index ]
+
+   return sketch_estimate( counts , n , index )
+
+
+# Procedure to return the k most frequent ngrams of order n, with
+# their percentage frequencies, ranked as in
+# freq_analysis.k_most_frequent_ngrams:
+
+def ranked_ngrams( counts , n , k ):
+
+   total = counts[ "totals" ][ n ]
+
+   if total == 0:
+
+      return []
+
+   if n in counts[ "dense" ]:
+
+      dense = counts[ "dense" ][ n ]
+
+      frequencies = [ ( index_to_ngram( index , n ) , dense[ index ] )
+                      for index in range( len( dense ) ) if dense[ index ] ]
+
+   else:
+
+      frequencies = sorted( counts[ "heavy" ][ n ].items() )
+
+   return rank_tuples_by_second_value( [ ( ngram , round( c * 100 / total , 1 ) )
+                                         for ngram , c in frequencies ] )[ : k ]
+
+
+# Procedure to return the k most frequent words with their percentage
+# frequencies:
+
+def ranked_words( counts , k ):
+
+   return ranked_ngrams( counts , "words" , k )
+
+
+# Procedure to save a counts structure to a file: a JSON header with
+# the settings, totals, heavy hitters and tails, followed by the raw
+# arrays of counts:
+
+def save_ngram_counts( counts , path ):
+
+   header = { key : counts[ key ] for key in [ "max_dense_n" , "sketch_orders" , "width"
+                                             , "depth" , "n_heavy" ] }
+
+   header[ "totals" ] = [ [ order , total ] for order , total in counts[ "totals" ].items() ]
+
+   header[ "heavy" ] = [ [ order , heavy ] for order , heavy in counts[ "heavy" ].items() ]
+
+   header[ "tail" ] = counts[ "tail" ].hex()
+
+   header[ "word_tail" ] = counts[ "word_tail" ].hex()
+
+   header = json.dumps( header ).encode( "ascii" )
+
+   arrays = ( [ counts[ "dense" ][ n ] for n in sorted( counts[ "dense" ] ) ]
+              + [ row for order in counts[ "sketch_orders" ]
+                  for row in counts[ "sketches" ][ order ] ] )
+
+   with open( path , "wb" ) as f:
+
+      f.write( counts_magic + struct.pack( "<I" , len( header ) ) + header )
+
+      for data in arrays:
+
+         if sys.byteorder != "little":
+
+            data = array( "Q" , data )
+
+            data.byteswap()
+
+         data.tofile( f )
+
+   return path
+
+
+# Procedure to load a counts structure saved by save_ngram_counts:
+
+def load_ngram_counts( path ):
+
+   with open( path , "rb" ) as f:
+
+      if f.read( 8 ) != counts_magic:
+
+         raise ValueError( path + " is not an ngram counts file." )
+
+      header_length , = struct.unpack( "<I" , f.read( 4 ) )
+
+      header = json.loads( f.read( header_length ) )
+
+      counts = new_ngram_counts( header[ "max_dense_n" ]
+                               , [ n for n in header[ "sketch_orders" ] if n != "words" ]
+                               , header[ "width" ] , header[ "depth" ] , header[ "n_heavy" ] )
+
+      arrays = ( [ counts[ "dense" ][ n ] for n in sorted( counts[ "dense" ] ) ]
+                 + [ row for order in counts[ "sketch_orders" ]
+                     for row in counts[ "sketches" ][ order ] ] )
+
+      for data in arrays:
+
+         size = len( data )
+
+         del data[ : ]
+
+         data.fromfile( f , size )
+
+         if sys.byteorder != "little":
+
+            data.byteswap()
+
+   counts[ "totals" ] = { order : total for order , total in header[ "totals" ] }
+
+   counts[ "heavy" ] = { order : heavy for order , heavy in header[ "heavy" ] }
+
+   counts[ "tail" ] = bytes.fromhex( header[ "tail" ] )
+
+   counts[ "word_tail" ] = bytes.fromhex( header[ "word_tail" ] )
+
+   return counts
@@ -0,0 +1,373 @@
+# Suite of python procedures to plan an attack on a transposition
+# cipher within a time budget, choosing how to search each key length
+# from a model of its cost, and to carry the plan out
+#
+# >>> from cipher_challenge.planner import *
+#
+# measure_throughput( ciphertext , ngrams_to_count , read_by , n_cal ) -> throughput
+# estimate_costs( n , throughput ) -> costs
+# plan_transposition( ciphertext , ngrams_to_count , read_by , seconds , key_lengths , max_n ) -> plan
+# print_plan( plan ) -> Nothing
+# run_plan( ciphertext , ngrams_to_count , read_by , plan , top_k , cancel ) -> result
+#
+# Each key length n can be searched in one of three ways (see
+# brute_force.py):
+#
+#   "exhaustive":  every permutation, scored incrementally by
+#                  incremental_transposition_scores
+#   "pruned":      branch_and_bound_transposition, which scores only
+#                  the permutations its bound cannot rule out
+#   "hill_climb":  hill_climb_transposition, repeated for as long as
+#                  the time allocated to n lasts, which may miss the
+#                  best permutation
+#
+# Throughput is measured on the ciphertext itself, on a key length
+# n_cal small enough to search in a moment: the permutations scored
+# per second by the exhaustive search, the leaves scored per second
+# by the pruned search and the fraction of leaves it scored at n_cal
+# - 1 and n_cal (which falls roughly geometrically with n), and the
+# evaluations per second of hill climbing. Each leaf of the pruned
+# search is taken to slow in proportion to n, while a hill climb
+# evaluation is taken to cost the same at every n (it rescores the
+# whole text, whose length does not change). The cost of an
+# exhaustive search of n is then n! divided by its throughput, and of
+# a pruned search the n! leaves times the extrapolated fraction
+# scored, divided by its throughput at n.
+#
+# The budget is shared between the key lengths in proportion to
+# 1 / rank, ranking them by brute_force.column_adjacency_score, best
+# first. Any length whose cheaper complete search (exhaustive or
+# pruned) fits its share is given that search and just the time it is
+# estimated to need, and what is left is shared again between the
+# others, until no more complete searches fit; the remaining lengths
+# are hill climbed for their shares. The complete searches are run
+# first, best ranked first, and then the hill climbs.
+#
+# A plan is a dictionary holding the budget in "seconds", the measured
+# "throughput", and a list of "steps", one per key length in the order
+# they are to be run, each a dictionary of:
+#
+#   "n", "score":         the key length and its adjacency score
+#   "method":             "exhaustive" | "pruned" | "hill_climb"
+#   "total":              n!, the number of permutations
+#   "estimates":          the estimated seconds for a complete
+#                         exhaustive or pruned search
+#   "allocated":          the seconds allocated to the step
+#   "expected":           the number of permutations it is expected
+#                         to score
+#   "actual", "evaluated", "complete":
+#                         once run, the seconds taken, the number of
+#                         permutations scored and whether every
+#                         permutation was accounted for
+#
+# run_plan returns a result as anytime.anytime_transposition does,
+# with a ranking for each step in the order run, and the plan (its
+# actual timings filled in) under "plan". Complete searches run to the
+# end however long they take (unless cancelled), and hill climbs stop
+# when their time is up; the time a step saves or overruns is added to
+# or taken from the next hill climb. Every hill climb step makes at
+# least one full climb, however much time earlier steps overran by.
+
+
+import math
+
+import time
+
+from . import anytime
+
+from . import brute_force
+
+from .core import remove_spaces
+
+
+# Procedure to measure the throughput of each search method on a
+# ciphertext, returning a dictionary:
+
+def measure_throughput( ciphertext , ngrams_to_count , read_by , n_cal = 7 ):
+
+   n_cal = max( 3 , min( n_cal , len( remove_spaces( ciphertext ) ) // 2 ) )
+
+   start = time.perf_counter()
+
+   for entry in brute_force.incremental_transposition_scores( ciphertext , ngrams_to_count
+                                                             , n_cal , read_by ):
+
+      pass
+
+   exhaustive_rate = math.factorial( n_cal ) / max( time.perf_counter() - start , 1e-9 )
+
+   fractions = []
+
+   for n in [ n_cal - 1 , n_cal ]:
+
+      start = time.perf_counter()
+
+      ranked_perms , stats = brute_force.branch_and_bound_transposition( ciphertext
+                                                                        , ngrams_to_count
+                                                                        , n , read_by , 10 )
+
+      fractions.append( stats[ "leaves_scored" ] / stats[ "total_leaves" ] )
+
+   pruned_rate = stats[ "leaves_scored" ] / max( time.perf_counter() - start , 1e-9 )
+
+   evaluations = [ 0 ]
+
+   def stop():
+
+      evaluations[ 0 ] += 1
+
+      return evaluations[ 0 ] >= 1000
+
+   start = time.perf_counter()
+
+   brute_force.hill_climb_transposition( ciphertext , ngrams_to_count , n_cal , read_by
+                                       , stop = stop )
+
+   hill_climb_rate = evaluations[ 0 ] / max( time.perf_counter() - start , 1e-9 )
+
+   return { "n_cal" : n_cal
+          , "exhaustive" : exhaustive_rate
+          , "pruned" : pruned_rate
+          , "pruned_fraction" : fractions[ 1 ]
+          , "pruned_ratio" : min( fractions[ 1 ] / max( fractions[ 0 ] , 1e-9 ) , 1 )
+          , "hill_climb" : hill_climb_rate }
+
+
+# Procedure to estimate the seconds needed to search key length n
+# completely by each method, returning a dictionary of them:
+
+def estimate_costs( n , throughput ):
+
+   total = math.factorial( n )
+
+   fraction = min( throughput[ "pruned_fraction" ]
+                   * throughput[ "pruned_ratio" ] ** ( n - throughput[ "n_cal" ] ) , 1 )
+
+   return { "exhaustive" : total / throughput[ "exhaustive" ]
+          , "pruned" : total * fraction * n / ( throughput[ "pruned" ] * throughput[ "n_cal" ] ) }
+
+
+# Procedure to estimate the number of permutations a step will score:
+
+def expected_evaluations( step , throughput ):
+
+   if step[ "method" ] == "hill_climb":
+
+      return round( step[ "allocated" ] * throughput[ "hill_climb" ] )
+
+   return round( step[ "estimates" ][ step[ "method" ] ] * throughput[ step[ "method" ] ]
+                 * ( throughput[ "n_cal" ] / step[ "n" ] if step[ "method" ] == "pruned" else 1 ) )
+
+
+# Procedure to plan an attack on a transposition cipher within a budget
+# of seconds. Key lengths are by default every factor of the
+# ciphertext length from 2 to max_n:
+
+def plan_transposition( ciphertext , ngrams_to_count , read_by , seconds = 60
+                      , key_lengths = None , max_n = 20 , throughput = None ):
+
+   n_char = len( remove_spaces( ciphertext ) )
+
+   if key_lengths is None:
+
+      key_lengths = [ n for n in range( 2 , max_n + 1 ) if n_char % n == 0 and n < n_char ]
+
+   if throughput is None:
+
+      throughput = measure_throughput( ciphertext , ngrams_to_count , read_by )
+
+   steps = []
+
+   for n in key_lengths:
+
+      steps.append( { "n" : n
+                    , "score" : brute_force.column_adjacency_score( ciphertext , ngrams_to_count
+                                                                  , n , read_by )
+                    , "method" : "hill_climb"
+                    , "total" : math.factorial( n )
+                    , "estimates" : estimate_costs( n , throughput )
+                    , "allocated" : 0
+                    , "actual" : None
+                    , "evaluated" : None
+                    , "complete" : None } )
+
+   steps.sort( key = lambda x : x[ "score" ] , reverse = True )
+
+   weights = { step[ "n" ] : 1 / ( rank + 1 ) for rank , step in enumerate( steps ) }
+
+   remaining = seconds
+
+   pending = list( steps )
+
+   fitted = True
+
+   while fitted and pending:
+
+      fitted = False
+
+      total_weight = sum( weights[ step[ "n" ] ] for step in pending )
+
+      for step in list( pending ):
+
+         share = remaining * weights[ step[ "n" ] ] / total_weight
+
+         method = min( step[ "estimates" ] , key = step[ "estimates" ].get )
+
+         if step[ "estimates" ][ method ] <= share:
+
+            step[ "method" ] = method
+
+            step[ "allocated" ] = step[ "estimates" ][ method ]
+
+            pending.remove( step )
+
+            fitted = True
+
+      remaining = seconds - sum( step[ "allocated" ] for step in steps )
+
+   total_weight = sum( weights[ step[ "n" ] ] for step in pending )
+
+   for step in pending:
+
+      step[ "allocated" ] = remaining * weights[ step[ "n" ] ] / total_weight
+
+   for step in steps:
+
+      step[ "expected" ] = expected_evaluations( step , throughput )
+
+   steps.sort( key = lambda x : x[ "method" ] == "hill_climb" )
+
+   return { "seconds" : seconds , "throughput" : throughput , "steps" : steps }
+
+
+# Procedure to print a plan as a table, with its actual timings if it
+# has been run:
+
+def print_plan( plan ):
+
+   print( "Budget of " + str( plan[ "seconds" ] ) + " s; exhaustive "
+          + str( round( plan[ "throughput" ][ "exhaustive" ] ) ) + " perms/s, pruned "
+          + str( round( plan[ "throughput" ][ "pruned" ] ) ) + " leaves/s, hill climb "
+          + str( round( plan[ "throughput" ][ "hill_climb" ] ) ) + " evals/s at n = "
+          + str( plan[ "throughput" ][ "n_cal" ] ) + "\n" )
+
+   print( "n\tscore\tmethod\t\tn!\t\texhaustive s\tpruned s\tallocated s\tactual s"
+          + "\texpected\tevaluated" )
+
+   for step in plan[ "steps" ]:
+
+      print( "\t".join( [ str( step[ "n" ] ) , str( round( step[ "score" ] , 3 ) )
+                        , step[ "method" ].ljust( 10 ) , str( step[ "total" ] ).ljust( 14 )
+                        , str( round( step[ "estimates" ][ "exhaustive" ] , 2 ) ).ljust( 12 )
+                        , str( round( step[ "estimates" ][ "pruned" ] , 2 ) ).ljust( 12 )
+                        , str( round( step[ "allocated" ] , 2 ) ).ljust( 12 )
+                        , ( "-" if step[ "actual" ] is None else str( round( step[ "actual" ] , 2 ) ) ).ljust( 8 )
+                        , str( step[ "expected" ] ).ljust( 8 )
+                        , "-" if step[ "evaluated" ] is None else str( step[ "evaluated" ] ) ] ) )
+
+
+# Procedure to carry out a plan, keeping the top_k permutations of
+# each step. Setting the optional threading.Event cancel stops the
+# run, as for anytime.new_budget:
+
+def run_plan( ciphertext , ngrams_to_count , read_by , plan , top_k = 10 , cancel = None ):
+
+   budget = anytime.new_budget( cancel = cancel )
+
+   ranked = []
+
+   coverage = []
+
+   carried = 0
+
+   for step in plan[ "steps" ]:
+
+      if anytime.budget_exhausted( budget ):
+
+         break
+
+      n = step[ "n" ]
+
+      start = time.monotonic()
+
+      if step[ "method" ] == "pruned":
+
+         ranked_perms , stats = brute_force.branch_and_bound_transposition(
+                                   ciphertext , ngrams_to_count , n , read_by , top_k
+                                 , stop = lambda : anytime.budget_exhausted( budget ) )
+
+         found = [ [ n , perm , count ] for perm , count in ranked_perms ]
+
+         step[ "evaluated" ] = stats[ "leaves_scored" ]
+
+         step[ "complete" ] = not stats[ "stopped" ]
+
+         budget[ "evaluations" ] += stats[ "leaves_scored" ]
+
+         coverage.append( { "n" : n , "method" : "pruned" , "evaluated" : stats[ "leaves_scored" ]
+                          , "total" : step[ "total" ] , "complete" : step[ "complete" ] } )
+
+      elif step[ "method" ] == "hill_climb":
+
+         # One full climb is made whatever time is left, and then more
+         # for as long as the step's time lasts:
+
+         ranked_perms , evaluations = brute_force.hill_climb_transposition(
+                                         ciphertext , ngrams_to_count , n , read_by , n_restarts = 1
+                                       , top_k = top_k , stop = lambda : anytime.budget_exhausted( budget ) )
+
+         found = [ [ n , perm , count ] for perm , count in ranked_perms ]
+
+         seconds = step[ "allocated" ] + carried - ( time.monotonic() - start )
+
+         if seconds > 0 and not anytime.budget_exhausted( budget ):
+
+            result = anytime.anytime_transposition( ciphertext , ngrams_to_count , read_by
+                                                  , anytime.new_budget( seconds , cancel = cancel )
+                                                  , [ n ] , top_k , max_exhaustive_n = 0 )
+
+            evaluations += result[ "evaluations" ]
+
+            found += [ entry for ranked_n in result[ "ranked" ] for entry in ranked_n
+                       if entry not in found ]
+
+            found.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+            del found[ top_k : ]
+
+         step[ "evaluated" ] = evaluations
+
+         step[ "complete" ] = False
+
+         budget[ "evaluations" ] += evaluations
+
+         coverage.append( { "n" : n , "method" : "hill_climb" , "evaluated" : evaluations
+                          , "total" : step[ "total" ] , "complete" : False } )
+
+      else:
+
+         result = anytime.anytime_transposition( ciphertext , ngrams_to_count , read_by
+                                               , anytime.new_budget( cancel = cancel ) , [ n ]
+                                               , top_k , max_exhaustive_n = n )
+
+         found = result[ "ranked" ][ 0 ] if result[ "ranked" ] else []
+
+         step[ "evaluated" ] = result[ "evaluations" ]
+
+         step[ "complete" ] = all( c[ "complete" ] for c in result[ "coverage" ] )
+
+         budget[ "evaluations" ] += result[ "evaluations" ]
+
+         coverage += result[ "coverage" ]
+
+      step[ "actual" ] = time.monotonic() - start
+
+      carried += step[ "allocated" ] - step[ "actual" ]
+
+      ranked.append( found )
+
+   result = anytime.anytime_result( ranked , coverage , budget )
+
+   result[ "plan" ] = plan
+
+   return result
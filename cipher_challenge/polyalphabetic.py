@@ -0,0 +1,509 @@
+# Suite of python procedures to encrypt, decrypt and solve periodic
+# polyalphabetic ciphers (Vigenere, Beaufort and variant Beaufort) and
+# the Vigenere autokey cipher
+#
+# >>> from cipher_challenge.polyalphabetic import *
+#
+# encrypt_periodic( plaintext , key , cipher ) -> ciphertext
+# decrypt_periodic( ciphertext , key , cipher ) -> plaintext
+# decrypt_periodic_batch( ciphertext , keys , cipher ) -> list_of_plaintexts
+# encrypt_autokey( plaintext , primer ) -> ciphertext
+# decrypt_autokey( ciphertext , primer ) -> plaintext
+# key_to_shifts( key ) -> list_of_shifts
+# rank_key_lengths( ciphertext , max_k , cipher ) -> ranked_lengths
+# estimate_key_length( ciphertext , max_k , cipher , kasiski_weight ) -> ranked_lengths
+# best_column_shifts( ciphertext , k , cipher , pack ) -> [ shifts , chi_squared ]
+# solve_periodic( ciphertext , cipher , max_k , n_lengths , pack ) -> ranked_solutions
+# solve_autokey( ciphertext , max_k , n_lengths , pack ) -> ranked_solutions
+#
+# NB. Argument cipher = "vigenere" | "beaufort" | "variant_beaufort",
+# or also "autokey" for encrypt_periodic, decrypt_periodic,
+# decrypt_periodic_batch, rank_key_lengths and estimate_key_length
+# (autokey ciphers are solved by solve_autokey)
+#
+# A key is a keyword such as "LEMON" or a list of shifts 0-25 (as for
+# vigenere.decrypt_vigenere, so [ 11 , 4 , 12 , 14 , 13 ] is "LEMON").
+# With key letter k, plaintext letter p and ciphertext letter c
+# (mod 26):
+#
+#   vigenere:          c = p + k ,   p = c - k
+#   beaufort:          c = k - p ,   p = k - c
+#   variant_beaufort:  c = p - k ,   p = c + k
+#   autokey:           as vigenere, with the keystream continuing
+#                      after the primer with the plaintext itself
+#
+# A ranked solution is a list [ key , plaintext , score ], with the
+# key as a list of shifts.
+#
+# Texts are handled as integer-encoded bytes (see language_model.py),
+# so only the letters A-Z are kept and the output is uppercase. Every
+# cipher is driven by a precomputed 26x26 tableau of translation
+# tables, and the letters under one key position are all translated
+# at once by slicing out every k-th letter.
+
+
+import operator
+
+from . import kasiski
+
+from . import language_model
+
+
+periodic_ciphers = [ "vigenere" , "beaufort" , "variant_beaufort" ]
+
+english_ioc = 0.0686
+
+
+# Procedures giving, for each cipher, the ciphertext letter from
+# plaintext letter p under key letter k, and the reverse:
+
+_encryptions = { "vigenere" : lambda p , k : ( p + k ) % 26
+               , "beaufort" : lambda p , k : ( k - p ) % 26
+               , "variant_beaufort" : lambda p , k : ( p - k ) % 26 }
+
+_decryptions = { "vigenere" : lambda c , k : ( c - k ) % 26
+               , "beaufort" : lambda c , k : ( k - c ) % 26
+               , "variant_beaufort" : lambda c , k : ( c + k ) % 26 }
+
+
+# Procedure to build the tableau of a letter operation as a list of 26
+# translation tables, one per key letter, over encoded letters:
+
+def make_tableau( operation ):
+
+   return [ bytes( operation( x , k ) if x < 26 else x for x in range( 256 ) )
+            for k in range( 26 ) ]
+
+
+encrypt_tableaux = { cipher : make_tableau( f ) for cipher , f in _encryptions.items() }
+
+decrypt_tableaux = { cipher : make_tableau( f ) for cipher , f in _decryptions.items() }
+
+
+# Flat 26x26 tables of c - k and p + k, indexed by 26 * first + second,
+# for the autokey cipher:
+
+_flat_minus = bytes( ( a - b ) % 26 for a in range( 26 ) for b in range( 26 ) )
+
+_flat_plus = bytes( ( a + b ) % 26 for a in range( 26 ) for b in range( 26 ) )
+
+
+# Procedure to convert a keyword or a list of shifts into a list of
+# shifts 0-25:
+
+def key_to_shifts( key ):
+
+   if isinstance( key , str ):
+
+      return list( language_model.encode_text( key ) )
+
+   return [ k % 26 for k in key ]
+
+
+# Procedure to apply a list of per-key-position translation tables to
+# an encoded text with period len( tables ):
+
+def apply_periodic_tables( encoded , tables ):
+
+   k = len( tables )
+
+   out = bytearray( len( encoded ) )
+
+   for m in range( k ):
+
+      out[ m : : k ] = encoded[ m : : k ].translate( tables[ m ] )
+
+   return bytes( out )
+
+
+# Procedure to encrypt a plaintext with a periodic cipher:
+
+def encrypt_periodic( plaintext , key , cipher ):
+
+   if cipher == "autokey":
+
+      return encrypt_autokey( plaintext , key )
+
+   tableau = encrypt_tableaux[ cipher ]
+
+   tables = [ tableau[ k ] for k in key_to_shifts( key ) ]
+
+   return language_model.decode_text( apply_periodic_tables(
+                                         language_model.encode_text( plaintext ) , tables ) )
+
+
+# Procedure to decrypt a ciphertext with a periodic cipher:
+
+def decrypt_periodic( ciphertext , key , cipher ):
+
+   if cipher == "autokey":
+
+      return decrypt_autokey( ciphertext , key )
+
+   tableau = decrypt_tableaux[ cipher ]
+
+   tables = [ tableau[ k ] for k in key_to_shifts( key ) ]
+
+   return language_model.decode_text( apply_periodic_tables(
+                                         language_model.encode_text( ciphertext ) , tables ) )
+
+
+# Procedure to decrypt one ciphertext under many keys of a periodic
+# cipher (keys may have different lengths). For each key length, each
+# key position has only 26 possible decryptions of its letters, so
+# these are computed once and every key of that length is assembled
+# from them (autokey keys are decrypted one at a time):
+
+def decrypt_periodic_batch( ciphertext , keys , cipher ):
+
+   if cipher == "autokey":
+
+      return [ decrypt_autokey( ciphertext , key ) for key in keys ]
+
+   encoded = language_model.encode_text( ciphertext )
+
+   tableau = decrypt_tableaux[ cipher ]
+
+   decrypted_columns = {}
+
+   plaintexts = []
+
+   for key in keys:
+
+      shifts = key_to_shifts( key )
+
+      k = len( shifts )
+
+      if k not in decrypted_columns:
+
+         decrypted_columns[ k ] = ( [ [ encoded[ m : : k ].translate( table )
+                                        for table in tableau ]
+                                      for m in range( k ) ] )
+
+      columns = decrypted_columns[ k ]
+
+      out = bytearray( len( encoded ) )
+
+      for m in range( k ):
+
+         out[ m : : k ] = columns[ m ][ shifts[ m ] ]
+
+      plaintexts.append( language_model.decode_text( out ) )
+
+   return plaintexts
+
+
+# Procedure to encrypt a plaintext with the autokey cipher, whose
+# keystream is the primer followed by the plaintext:
+
+def encrypt_autokey( plaintext , primer ):
+
+   encoded = language_model.encode_text( plaintext )
+
+   keystream = bytes( key_to_shifts( primer ) ) + encoded
+
+   indices = map( operator.add , map( ( 26 ).__mul__ , encoded ) , keystream )
+
+   return language_model.decode_text( bytes( map( _flat_plus.__getitem__ , indices ) ) )
+
+
+# Procedure to decrypt an autokey ciphertext: each plaintext letter
+# is recovered from the plaintext letter one primer length before it,
+# so each key position is decrypted as a chain:
+
+def decrypt_autokey( ciphertext , primer ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   shifts = key_to_shifts( primer )
+
+   out = bytearray( len( encoded ) )
+
+   for m , k in enumerate( shifts ):
+
+      out[ m : : len( shifts ) ] = autokey_chain( encoded[ m : : len( shifts ) ] , k )
+
+   return language_model.decode_text( out )
+
+
+# Procedure to decrypt the letters under one key position of an
+# autokey cipher, given the primer letter k that starts the chain:
+
+def autokey_chain( column , k ):
+
+   chain = bytearray( len( column ) )
+
+   for j , c in enumerate( column ):
+
+      k = _flat_minus[ c * 26 + k ]
+
+      chain[ j ] = k
+
+   return chain
+
+
+# Procedure to count the letters of an encoded text:
+
+def letter_counts( encoded ):
+
+   return [ encoded.count( x ) for x in range( 26 ) ]
+
+
+# Procedure to calculate the index of coincidence of an encoded text
+# from its letter counts (cf. vigenere.calculate_ioc):
+
+def ioc_from_counts( counts ):
+
+   n = sum( counts )
+
+   if n < 2:
+
+      return 0
+
+   return sum( c * ( c - 1 ) for c in counts ) / ( n * ( n - 1 ) )
+
+
+# Procedure to find the shift 0-25 for one key position that brings
+# the letter counts of its decryption closest to English by the
+# chi-squared statistic, given the ciphertext letter counts at that
+# position. Each plaintext letter's count is read off the count of
+# the ciphertext letter it encrypts to, so nothing is decrypted.
+# Letters with no expected count (every letter of an empty column, or
+# one a pack gives zero frequency) are skipped, so an empty column gets
+# shift 0. Returns [ shift , chi_squared ]:
+
+def best_shift_for_counts( counts , cipher , english ):
+
+   n = sum( counts )
+
+   tableau = encrypt_tableaux[ cipher ]
+
+   best = [ 0 , float( "inf" ) ]
+
+   for k in range( 26 ):
+
+      table = tableau[ k ]
+
+      chi_squared = 0
+
+      for p in range( 26 ):
+
+         expected = n * english[ p ] / 100
+
+         if expected > 0:
+
+            chi_squared += ( counts[ table[ p ] ] - expected ) ** 2 / expected
+
+      if chi_squared < best[ 1 ]:
+
+         best = [ k , chi_squared ]
+
+   return best
+
+
+# Procedure to find the most likely shift for each key position of a
+# periodic cipher with key length k, returning [ shifts ,
+# total_chi_squared ]:
+
+def best_column_shifts( ciphertext , k , cipher , pack = None ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   english = language_model.letter_frequencies( pack )
+
+   shifts = []
+
+   total = 0
+
+   for m in range( k ):
+
+      shift , chi_squared = best_shift_for_counts( letter_counts( encoded[ m : : k ] )
+                                                 , cipher , english )
+
+      shifts.append( shift )
+
+      total += chi_squared
+
+   return [ shifts , total ]
+
+
+# Procedure to find the best primer letter for each key position of
+# an autokey cipher with primer length k, returning [ shifts ,
+# total_chi_squared ]:
+
+def best_autokey_primer( ciphertext , k , pack = None ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   english = language_model.letter_frequencies( pack )
+
+   shifts = []
+
+   total = 0
+
+   for m in range( k ):
+
+      column = encoded[ m : : k ]
+
+      n = len( column )
+
+      best = [ 0 , float( "inf" ) ]
+
+      for s in range( 26 ):
+
+         counts = letter_counts( autokey_chain( column , s ) )
+
+         chi_squared = sum( ( counts[ p ] - n * english[ p ] / 100 ) ** 2
+                            / ( n * english[ p ] / 100 ) for p in range( 26 )
+                            if n * english[ p ] > 0 )
+
+         if chi_squared < best[ 1 ]:
+
+            best = [ s , chi_squared ]
+
+      shifts.append( best[ 0 ] )
+
+      total += best[ 1 ]
+
+   return [ shifts , total ]
+
+
+# Procedure to rank putative key lengths 1 to max_k, best first,
+# returning ( k , score ) pairs. For the periodic ciphers every key
+# position is a monoalphabetic substitution, so the score is the
+# average index of coincidence of the letters under each key position
+# (cf. vigenere.average_ioc_for_k), and lengths are ranked by how
+# close it is to that of English. An autokey ciphertext has no such
+# period, so its lengths are ranked by the average chi-squared per
+# letter of the best primer for each, and a lower score is better:
+
+def rank_key_lengths( ciphertext , max_k , cipher = "vigenere" ):
+
+   encoded = language_model.encode_text( ciphertext )
+
+   max_k = min( max_k , max( len( encoded ) // 2 , 1 ) )
+
+   if cipher == "autokey":
+
+      ranked = [ ( k , best_autokey_primer( ciphertext , k )[ 1 ] / max( len( encoded ) , 1 ) )
+                 for k in range( 1 , max_k + 1 ) ]
+
+      return sorted( ranked , key = lambda x : x[ 1 ] )
+
+   ranked = [ ( k , sum( ioc_from_counts( letter_counts( encoded[ m : : k ] ) )
+                         for m in range( k ) ) / k )
+              for k in range( 1 , max_k + 1 ) ]
+
+   return sorted( ranked , key = lambda x : abs( x[ 1 ] - english_ioc ) )
+
+
+# Procedure to rank putative key lengths 1 to max_k of a periodic
+# cipher, best first, by combining the index of coincidence with a
+# Kasiski examination (see kasiski.py), returning ( k , score ) pairs
+# with scores from 0 to 1. The IoC part scores how close the average
+# IoC under each key position is to that of English, relative to the
+# IoC of random letters; the Kasiski part is the excess fraction of
+# repeat distances that k divides. Multiples of the key length have as
+# good an IoC as the key length itself, but fewer distances divisible
+# by them, and short texts may have no repeats at all, so neither is
+# enough on its own. An autokey cipher has no period, so its lengths
+# are simply ranked by rank_key_lengths:
+
+def estimate_key_length( ciphertext , max_k , cipher = "vigenere" , kasiski_weight = 0.5 ):
+
+   if cipher == "autokey":
+
+      return rank_key_lengths( ciphertext , max_k , cipher )
+
+   ioc_scores = { k : max( 0 , 1 - abs( ioc - english_ioc ) / ( english_ioc - 1 / 26 ) )
+                  for k , ioc in rank_key_lengths( ciphertext , max_k , cipher ) }
+
+   kasiski_scores = dict( kasiski.rank_kasiski_lengths( ciphertext , max( ioc_scores ) ) )
+
+   ranked = [ ( k , ( 1 - kasiski_weight ) * ioc_score
+                    + kasiski_weight * max( 0 , kasiski_scores.get( k , 0 ) ) )
+              for k , ioc_score in ioc_scores.items() ]
+
+   return sorted( ranked , key = lambda x : x[ 1 ] , reverse = True )
+
+
+# Procedure to shorten a list of shifts that repeats with a shorter
+# period to a single period:
+
+def minimal_period( shifts ):
+
+   k = len( shifts )
+
+   for d in range( 1 , k ):
+
+      if k % d == 0 and shifts == shifts[ : d ] * ( k // d ):
+
+         return shifts[ : d ]
+
+   return shifts
+
+
+# Procedure to score a candidate decryption by quadgram fitness if a
+# pack is given, or else by minus the chi-squared distance of its
+# letter frequencies from English:
+
+def score_plaintext( plaintext , chi_squared , pack ):
+
+   if pack is not None:
+
+      return language_model.ngram_fitness( plaintext , pack )
+
+   return -chi_squared
+
+
+# Procedure to solve a periodic cipher: the n_lengths best key lengths
+# from estimate_key_length are each given their most likely shifts, and
+# the decryptions are returned ranked by score, best first:
+
+def solve_periodic( ciphertext , cipher , max_k = 12 , n_lengths = 3 , pack = None ):
+
+   ranked_solutions = []
+
+   seen = []
+
+   for k , score in estimate_key_length( ciphertext , max_k , cipher )[ : n_lengths ]:
+
+      shifts , chi_squared = best_column_shifts( ciphertext , k , cipher , pack )
+
+      shifts = minimal_period( shifts )
+
+      if shifts in seen:
+
+         continue
+
+      seen.append( shifts )
+
+      plaintext = decrypt_periodic( ciphertext , shifts , cipher )
+
+      ranked_solutions.append( [ shifts , plaintext
+                               , score_plaintext( plaintext , chi_squared , pack ) ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return ranked_solutions
+
+
+# Procedure to solve an autokey cipher in the same way, with primer
+# lengths ranked by rank_key_lengths:
+
+def solve_autokey( ciphertext , max_k = 12 , n_lengths = 3 , pack = None ):
+
+   ranked_solutions = []
+
+   for k , score in rank_key_lengths( ciphertext , max_k , "autokey" )[ : n_lengths ]:
+
+      shifts , chi_squared = best_autokey_primer( ciphertext , k , pack )
+
+      plaintext = decrypt_autokey( ciphertext , shifts )
+
+      ranked_solutions.append( [ shifts , plaintext
+                               , score_plaintext( plaintext , chi_squared , pack ) ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 2 ] , reverse = True )
+
+   return ranked_solutions
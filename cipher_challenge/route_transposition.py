@@ -0,0 +1,354 @@
+# Suite of python procedures to encrypt, decrypt and solve route,
+# rail fence and scytale transposition ciphers
+#
+# >>> from cipher_challenge.route_transposition import *
+#
+# encrypt_route( plaintext , family , params ) -> ciphertext
+# decrypt_route( ciphertext , family , params ) -> plaintext
+# route_read_order( length , family , params ) -> read_order
+# route_decrypt_map( length , family , params ) -> decrypt_map
+# route_parameters( length , family , max_rails ) -> list_of_params
+# solve_route_family( ciphertext , family , pack , ngrams_to_count , n_best ) -> ranked_solutions
+# solve_all_routes( ciphertext , pack , ngrams_to_count , n_best ) -> ranked_solutions
+#
+# NB. Argument family = "rail_fence" | "scytale" | "route", with params
+# a tuple:
+#
+#   rail_fence:  ( rails , offset ), where the zigzag starts offset
+#                steps into its cycle of 2 * ( rails - 1 ) steps
+#   scytale:     ( turns , ), the number of letters around the rod:
+#                the plaintext is written in turns rows and read down
+#                the columns
+#   route:       ( rows , cols , route , corner ), where the plaintext
+#                is written by rows into a rows x cols grid (with any
+#                empty cells at the end of the last row) and read
+#                along the route from the corner
+#
+# route = "rows" | "columns" | "serpentine_rows" | "serpentine_columns"
+#       | "spiral_clockwise" | "spiral_anticlockwise" | "diagonals"
+# corner = "top_left" | "top_right" | "bottom_left" | "bottom_right"
+#
+# Every cipher is described by its read order, the plaintext position
+# of each ciphertext letter. Its inverse, the decrypt map, gives the
+# ciphertext position of each plaintext letter, so decryption is a
+# single gather. Both are computed once per (text length, family,
+# params) and cached, except by the solvers, which use each map once.
+#
+# A ranked solution is a list [ family , params , plaintext , score ],
+# scored by quadgram fitness under a language pack (see
+# language_model.py) if one is given, or else by the count of
+# ngrams_to_count as in brute_force.py. Parameters whose maps are the
+# same (by SHA-1 digest) are scored once, and only the n_best solutions are
+# kept.
+#
+# NB. Spaces are removed from the ciphertext; it must not contain
+# punctuation or newlines.
+
+
+import functools
+
+import hashlib
+
+import heapq
+
+import operator
+
+from array import array
+
+from . import brute_force
+
+from . import language_model
+
+
+route_families = [ "rail_fence" , "scytale" , "route" ]
+
+grid_routes = ( [ "rows" , "columns" , "serpentine_rows" , "serpentine_columns"
+                , "spiral_clockwise" , "spiral_anticlockwise" , "diagonals" ] )
+
+grid_corners = [ "top_left" , "top_right" , "bottom_left" , "bottom_right" ]
+
+
+# Procedure to list the plaintext positions of a rail fence cipher in
+# the order they are read off the rails:
+
+def rail_fence_order( length , rails , offset ):
+
+   cycle = 2 * ( rails - 1 )
+
+   def rail( j ):
+
+      phase = ( j + offset ) % cycle
+
+      return phase if phase < rails else cycle - phase
+
+   return sorted( range( length ) , key = lambda j : ( rail( j ) , j ) )
+
+
+# Procedure to list the plaintext positions of a scytale cipher in
+# the order they are read down the columns:
+
+def scytale_order( length , turns ):
+
+   width = -( -length // turns )
+
+   return [ r * width + c for c in range( width ) for r in range( turns )
+            if r * width + c < length ]
+
+
+# Procedure to list the cells ( row , col ) of a rows x cols grid in
+# the order of a route from the top left corner:
+
+def grid_route_cells( rows , cols , route ):
+
+   if route == "rows":
+
+      return [ ( r , c ) for r in range( rows ) for c in range( cols ) ]
+
+   if route == "columns":
+
+      return [ ( r , c ) for c in range( cols ) for r in range( rows ) ]
+
+   if route == "serpentine_rows":
+
+      return [ ( r , c if r % 2 == 0 else cols - 1 - c )
+               for r in range( rows ) for c in range( cols ) ]
+
+   if route == "serpentine_columns":
+
+      return [ ( r if c % 2 == 0 else rows - 1 - r , c )
+               for c in range( cols ) for r in range( rows ) ]
+
+   if route == "diagonals":
+
+      return [ ( r , d - r ) for d in range( rows + cols - 1 )
+               for r in range( rows ) if 0 <= d - r < cols ]
+
+   if route == "spiral_anticlockwise":
+
+      return [ ( r , c ) for c , r in grid_route_cells( cols , rows , "spiral_clockwise" ) ]
+
+   cells = []
+
+   top , bottom , left , right = 0 , rows - 1 , 0 , cols - 1
+
+   while top <= bottom and left <= right:
+
+      cells += [ ( top , c ) for c in range( left , right + 1 ) ]
+
+      cells += [ ( r , right ) for r in range( top + 1 , bottom + 1 ) ]
+
+      if top < bottom:
+
+         cells += [ ( bottom , c ) for c in range( right - 1 , left - 1 , -1 ) ]
+
+      if left < right:
+
+         cells += [ ( r , left ) for r in range( bottom - 1 , top , -1 ) ]
+
+      top , bottom , left , right = top + 1 , bottom - 1 , left + 1 , right - 1
+
+   return cells
+
+
+# Procedure to list the plaintext positions of a grid route cipher in
+# the order they are read, skipping the empty cells after the end of
+# the text:
+
+def grid_route_order( length , rows , cols , route , corner ):
+
+   order = []
+
+   for r , c in grid_route_cells( rows , cols , route ):
+
+      if corner in [ "bottom_left" , "bottom_right" ]:
+
+         r = rows - 1 - r
+
+      if corner in [ "top_right" , "bottom_right" ]:
+
+         c = cols - 1 - c
+
+      if r * cols + c < length:
+
+         order.append( r * cols + c )
+
+   return order
+
+
+# Procedure to give the read order of a cipher, cached by text
+# length, family and params:
+
+@functools.lru_cache( maxsize = 4096 )
+def route_read_order( length , family , params ):
+
+   if family == "rail_fence":
+
+      order = rail_fence_order( length , *params )
+
+   elif family == "scytale":
+
+      order = scytale_order( length , *params )
+
+   else:
+
+      order = grid_route_order( length , *params )
+
+   return tuple( order )
+
+
+# Procedure to invert a read order into a decrypt map:
+
+def invert_order( read_order ):
+
+   decrypt_map = [ 0 ] * len( read_order )
+
+   for i , j in enumerate( read_order ):
+
+      decrypt_map[ j ] = i
+
+   return tuple( decrypt_map )
+
+
+# Procedure to give the decrypt map of a cipher (the inverse of its
+# read order), cached in the same way:
+
+@functools.lru_cache( maxsize = 4096 )
+def route_decrypt_map( length , family , params ):
+
+   return invert_order( route_read_order( length , family , params ) )
+
+
+# Procedure to gather the characters of a text at a list of positions:
+
+def gather( text , positions ):
+
+   if len( positions ) < 2:
+
+      return ''.join( text[ j ] for j in positions )
+
+   return ''.join( operator.itemgetter( *positions )( text ) )
+
+
+# Procedure to encrypt a plaintext with a route transposition:
+
+def encrypt_route( plaintext , family , params ):
+
+   plaintext = ''.join( plaintext.split() )
+
+   return gather( plaintext , route_read_order( len( plaintext ) , family , tuple( params ) ) )
+
+
+# Procedure to decrypt a ciphertext with a route transposition:
+
+def decrypt_route( ciphertext , family , params ):
+
+   ciphertext = ''.join( ciphertext.split() )
+
+   return gather( ciphertext , route_decrypt_map( len( ciphertext ) , family , tuple( params ) ) )
+
+
+# Procedure to list every parameter tuple of a family that makes sense
+# for a text of the given length: up to max_rails rails (with every
+# offset), up to length // 2 turns, and every grid of at least two
+# rows and columns whose last row is not empty:
+
+def route_parameters( length , family , max_rails = 20 ):
+
+   if family == "rail_fence":
+
+      return [ ( rails , offset ) for rails in range( 2 , min( max_rails , length - 1 ) + 1 )
+               for offset in range( 2 * ( rails - 1 ) ) ]
+
+   if family == "scytale":
+
+      return [ ( turns , ) for turns in range( 2 , length // 2 + 1 ) ]
+
+   params = []
+
+   for rows in range( 2 , length // 2 + 1 ):
+
+      cols = -( -length // rows )
+
+      if cols >= 2 and ( rows - 1 ) * cols < length:
+
+         params += [ ( rows , cols , route , corner )
+                     for route in grid_routes for corner in grid_corners ]
+
+   return params
+
+
+# Procedure to score a decrypted text by quadgram fitness if a pack is
+# given, or else by the count of ngrams_to_count:
+
+def score_text( text , ngrams_to_count , pack ):
+
+   if pack is not None:
+
+      return language_model.ngram_fitness( text , pack )
+
+   return brute_force.count_common_ngrams_in_text( text , ngrams_to_count )
+
+
+# Procedure to decrypt a ciphertext under every parameter tuple of a
+# family and return the n_best decryptions ranked by score:
+
+def solve_route_family( ciphertext , family , pack = None
+                      , ngrams_to_count = [ "THE" , "TH" , "ER" ] , n_best = 10 ):
+
+   return solve_all_routes( ciphertext , pack , ngrams_to_count , n_best , [ family ] )
+
+
+# Procedure to do the same across several families (by default all of
+# them), scoring each distinct decrypt map once:
+
+def solve_all_routes( ciphertext , pack = None , ngrams_to_count = [ "THE" , "TH" , "ER" ]
+                    , n_best = 10 , families = route_families ):
+
+   ciphertext = ''.join( ciphertext.split() )
+
+   n = len( ciphertext )
+
+   # Digests of the decrypt maps already scored, and a heap of the
+   # n_best solutions so far as ( score , -index , solution ), so that
+   # of equal scores the first found ranks first:
+
+   seen = set()
+
+   heap = []
+
+   index = 0
+
+   for family in families:
+
+      for params in route_parameters( n , family ):
+
+         # Each map is used once here, so it bypasses the caches rather
+         # than filling them with maps of this length:
+
+         decrypt_map = invert_order( route_read_order.__wrapped__( n , family , params ) )
+
+         key = hashlib.sha1( array( "I" , decrypt_map ) ).digest()
+
+         if key in seen:
+
+            continue
+
+         seen.add( key )
+
+         plaintext = gather( ciphertext , decrypt_map )
+
+         score = score_text( plaintext , ngrams_to_count , pack )
+
+         entry = ( score , -index , [ family , params , plaintext , score ] )
+
+         index += 1
+
+         if len( heap ) < n_best:
+
+            heapq.heappush( heap , entry )
+
+         elif entry > heap[ 0 ]:
+
+            heapq.heapreplace( heap , entry )
+
+   return [ entry[ 2 ] for entry in sorted( heap , reverse = True ) ]
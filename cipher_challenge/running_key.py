@@ -0,0 +1,423 @@
+# Suite of python procedures to solve running-key (book) ciphers,
+# whose key is a passage of a known text, by sliding the ciphertext
+# across every position of a reference corpus
+#
+# >>> from cipher_challenge.running_key import *
+#
+# load_corpus( corpus_paths , cache_path ) -> corpus
+# load_corpus_cache( cache_path ) -> corpus
+# corpus_position( corpus , offset ) -> [ source_path , letter_index ]
+# decrypt_running_key( ciphertext , key_text , cipher ) -> plaintext
+# sweep_offsets( ciphertext , corpus , start , stop , cipher , pack , n_keep ) -> scored_offsets
+# solve_running_key( ciphertext , corpus , cipher , pack , n_best , workers ) -> ranked_solutions
+#
+# NB. Argument cipher = "vigenere" | "beaufort" | "variant_beaufort"
+#
+# The corpus is given as a list of text files and directories (whose
+# .txt files are all read, in sorted order). Its letters are encoded
+# once, as in language_model.py, into a cache file that is then
+# memory-mapped, so later loads are near-instant and worker processes
+# share one copy of it through the page cache. The cache is rebuilt
+# whenever a source file's size or modification time changes.
+#
+# Cache file layout: magic "CIPHRKEY" | header length (uint32) | JSON
+# header listing the sources, with the letter index at which each
+# starts | encoded letters, aligned to 8 bytes.
+#
+# Every offset of the corpus is scored in chunks of chunk_size offsets
+# by the bigram log-probabilities of its decryption (or the letter
+# log-probabilities if no pack is given, see language_model.py). For
+# each ciphertext position i, the plaintext bigram at i depends only on
+# the corpus bigram at offset + i, so a table of 676 scores is made for
+# each position and looked up along the corpus bigrams of the whole
+# chunk at once. The best offsets of the sweep are rescored by the
+# quadgram fitness of their decryptions. A ranked solution is a list
+# [ offset , key_text , plaintext , score ], best first.
+#
+# NB. Only the letters A-Z are kept, and output is uppercase.
+
+
+import hashlib
+
+import heapq
+
+import json
+
+import math
+
+import mmap
+
+import operator
+
+import os
+
+import struct
+
+import tempfile
+
+from concurrent.futures import ProcessPoolExecutor
+
+from . import language_model
+
+from . import polyalphabetic
+
+
+corpus_magic = b"CIPHRKEY"
+
+# Corpora already loaded by this process, by cache path:
+
+_loaded_corpora = {}
+
+
+# Procedure to list the source files of a corpus, with their sizes and
+# modification times:
+
+def corpus_sources( corpus_paths ):
+
+   if isinstance( corpus_paths , str ):
+
+      corpus_paths = [ corpus_paths ]
+
+   sources = []
+
+   for path in corpus_paths:
+
+      if os.path.isdir( path ):
+
+         files = sorted( os.path.join( root , name ) for root , dirs , names in os.walk( path )
+                         for name in names if name.endswith( ".txt" ) )
+
+      else:
+
+         files = [ path ]
+
+      for f in files:
+
+         stat = os.stat( f )
+
+         sources.append( [ os.path.abspath( f ) , stat.st_size , stat.st_mtime ] )
+
+   return sources
+
+
+# Procedure to give the default cache path for a list of sources:
+
+def default_cache_path( sources ):
+
+   digest = hashlib.sha1( "\n".join( s[ 0 ] for s in sources ).encode( "utf-8" ) ).hexdigest()
+
+   return os.path.join( tempfile.gettempdir() , "cipher_challenge-" + digest[ : 16 ] + ".corpus" )
+
+
+# Procedure to encode the letters of the sources into a cache file,
+# reading chunk_size bytes at a time. It is written through temporary
+# files of its own beside the cache and moved into place at the end, so
+# processes building the same cache at once cannot corrupt it:
+
+def build_corpus_cache( sources , cache_path , chunk_size = 2 ** 20 ):
+
+   starts = []
+
+   n_letters = 0
+
+   directory = os.path.dirname( os.path.abspath( cache_path ) )
+
+   with tempfile.NamedTemporaryFile( dir = directory , suffix = ".letters" , delete = False ) as out:
+
+      letters_path = out.name
+
+      for path , size , mtime in sources:
+
+         starts.append( n_letters )
+
+         with open( path , "rb" ) as f:
+
+            chunk = f.read( chunk_size )
+
+            while chunk:
+
+               encoded = language_model.encode_text( chunk.upper() )
+
+               out.write( encoded )
+
+               n_letters += len( encoded )
+
+               chunk = f.read( chunk_size )
+
+   header = json.dumps( { "sources" : sources , "starts" : starts
+                        , "length" : n_letters } ).encode( "utf-8" )
+
+   data_offset = ( 12 + len( header ) + 7 ) // 8 * 8
+
+   with tempfile.NamedTemporaryFile( dir = directory , suffix = ".tmp" , delete = False ) as out:
+
+      out.write( corpus_magic + struct.pack( "<I" , len( header ) ) + header )
+
+      out.write( bytes( data_offset - 12 - len( header ) ) )
+
+      with open( letters_path , "rb" ) as f:
+
+         chunk = f.read( chunk_size )
+
+         while chunk:
+
+            out.write( chunk )
+
+            chunk = f.read( chunk_size )
+
+   os.remove( letters_path )
+
+   os.replace( out.name , cache_path )
+
+   return cache_path
+
+
+# Procedure to read the header of a cache file, or None if it is not
+# one:
+
+def read_corpus_header( buf ):
+
+   if buf[ : 8 ] != corpus_magic:
+
+      return None
+
+   header_length , = struct.unpack_from( "<I" , buf , 8 )
+
+   header = json.loads( bytes( buf[ 12 : 12 + header_length ] ) )
+
+   header[ "data_offset" ] = ( 12 + header_length + 7 ) // 8 * 8
+
+   return header
+
+
+# Procedure to memory-map a corpus cache file by its path, returning
+# a dictionary holding the cache "path", the "sources" and their
+# "starts", and the "letters" as a read-only memoryview of encoded
+# bytes (or None if the file is not a corpus cache):
+
+def load_corpus_cache( cache_path ):
+
+   if cache_path in _loaded_corpora:
+
+      return _loaded_corpora[ cache_path ]
+
+   with open( cache_path , "rb" ) as f:
+
+      buf = mmap.mmap( f.fileno() , 0 , access = mmap.ACCESS_READ )
+
+   header = read_corpus_header( buf )
+
+   if header is None:
+
+      buf.close()
+
+      return None
+
+   corpus = { "path" : cache_path , "sources" : header[ "sources" ] , "starts" : header[ "starts" ]
+            , "mmap" : buf
+            , "letters" : memoryview( buf )[ header[ "data_offset" ]
+                                             : header[ "data_offset" ] + header[ "length" ] ] }
+
+   _loaded_corpora[ cache_path ] = corpus
+
+   return corpus
+
+
+# Procedure to load a corpus as load_corpus_cache does, building (or
+# rebuilding) its cache first if it is missing or out of date:
+
+def load_corpus( corpus_paths , cache_path = None ):
+
+   sources = corpus_sources( corpus_paths )
+
+   if cache_path is None:
+
+      cache_path = default_cache_path( sources )
+
+   cache_path = os.path.abspath( cache_path )
+
+   if os.path.exists( cache_path ) and os.path.getsize( cache_path ) > 12:
+
+      corpus = load_corpus_cache( cache_path )
+
+      if corpus is not None and corpus[ "sources" ] == sources:
+
+         return corpus
+
+      _loaded_corpora.pop( cache_path , None )
+
+   build_corpus_cache( sources , cache_path )
+
+   return load_corpus_cache( cache_path )
+
+
+# Procedure to find which source file an offset of the corpus lies in,
+# and at which of its letters:
+
+def corpus_position( corpus , offset ):
+
+   i = max( j for j , start in enumerate( corpus[ "starts" ] ) if start <= offset )
+
+   return [ corpus[ "sources" ][ i ][ 0 ] , offset - corpus[ "starts" ][ i ] ]
+
+
+# Procedure to decrypt a ciphertext with a running key taken from the
+# letters of key_text:
+
+def decrypt_running_key( ciphertext , key_text , cipher = "vigenere" ):
+
+   tableau = polyalphabetic.decrypt_tableaux[ cipher ]
+
+   encoded = language_model.encode_text( ciphertext )
+
+   key = language_model.encode_text( key_text )
+
+   return language_model.decode_text( bytes( tableau[ k ][ c ] for c , k in zip( encoded , key ) ) )
+
+
+# Procedure to make, for each ciphertext position i, the table of the
+# score of the plaintext bigram at i under each key bigram (indexed
+# 26 * first + second), from the pack's bigram log-probabilities or,
+# with no pack, the letter log-probabilities of the first letter. The
+# last position has no bigram and is scored by its letter alone:
+
+def bigram_score_tables( encoded , cipher , pack ):
+
+   tableau = polyalphabetic.decrypt_tableaux[ cipher ]
+
+   if pack is not None:
+
+      letter_scores = list( pack[ "unigrams" ] )
+
+      bigram_scores = list( pack[ "bigrams" ] )
+
+   else:
+
+      letter_scores = [ math.log10( f / 100 ) for f in language_model.letter_frequencies() ]
+
+      bigram_scores = [ letter_scores[ a ] for a in range( 26 ) for b in range( 26 ) ]
+
+   tables = []
+
+   for i , c in enumerate( encoded ):
+
+      first = [ tableau[ k ][ c ] for k in range( 26 ) ]
+
+      if i + 1 < len( encoded ):
+
+         second = [ tableau[ k ][ encoded[ i + 1 ] ] for k in range( 26 ) ]
+
+         tables.append( [ bigram_scores[ 26 * first[ a ] + second[ b ] ]
+                          for a in range( 26 ) for b in range( 26 ) ] )
+
+      else:
+
+         tables.append( [ letter_scores[ first[ a ] ] for a in range( 26 ) for b in range( 26 ) ] )
+
+   return tables
+
+
+# Procedure to score the offsets start to stop - 1 of a corpus (which
+# may also be given by its cache path, as it is to worker processes,
+# and the pack by its path),
+# returning the n_keep best as ( score , offset ) pairs:
+
+def sweep_offsets( ciphertext , corpus , start , stop , cipher = "vigenere" , pack = None
+                 , n_keep = 100 ):
+
+   if isinstance( corpus , str ):
+
+      corpus = load_corpus_cache( corpus )
+
+   if isinstance( pack , str ):
+
+      pack = language_model.load_language_pack( pack )
+
+   encoded = language_model.encode_text( ciphertext )
+
+   m = len( encoded )
+
+   letters = corpus[ "letters" ]
+
+   stop = min( stop , len( letters ) - m + 1 )
+
+   if not encoded or stop <= start:
+
+      return []
+
+   tables = bigram_score_tables( encoded , cipher , pack )
+
+   # Corpus bigrams from offset start onwards, the last one padded:
+
+   window = bytes( letters[ start : stop + m ] )
+
+   key_bigrams = list( map( operator.add , map( ( 26 ).__mul__ , window )
+                          , window[ 1 : ] + bytes( 1 ) ) )
+
+   n_offsets = stop - start
+
+   scores = list( map( tables[ 0 ].__getitem__ , key_bigrams[ : n_offsets ] ) )
+
+   for i in range( 1 , m ):
+
+      scores = list( map( operator.add , scores
+                          , map( tables[ i ].__getitem__ , key_bigrams[ i : i + n_offsets ] ) ) )
+
+   return [ ( score , start + j )
+            for j , score in heapq.nlargest( n_keep , enumerate( scores )
+                                           , key = operator.itemgetter( 1 ) ) ]
+
+
+# Procedure to solve a running-key cipher: every offset of the corpus
+# (a loaded corpus, or a list of paths to load) is swept in chunks of
+# chunk_size offsets, spread over a pool of worker processes if
+# workers is more than 1, and the n_candidates best offsets are
+# decrypted and ranked by quadgram fitness if a pack is given (or else
+# by their sweep score), returning the n_best as ranked solutions:
+
+def solve_running_key( ciphertext , corpus , cipher = "vigenere" , pack = None , n_best = 10
+                     , workers = None , chunk_size = 2 ** 18 , n_candidates = 100 ):
+
+   if not isinstance( corpus , dict ):
+
+      corpus = load_corpus( corpus )
+
+   m = len( language_model.encode_text( ciphertext ) )
+
+   n_offsets = len( corpus[ "letters" ] ) - m + 1
+
+   starts = range( 0 , max( n_offsets , 0 ) , chunk_size )
+
+   if workers is not None and workers > 1:
+
+      with ProcessPoolExecutor( workers ) as pool:
+
+         futures = [ pool.submit( sweep_offsets , ciphertext , corpus[ "path" ] , s , s + chunk_size
+                                , cipher , None if pack is None else pack[ "path" ] , n_candidates )
+                     for s in starts ]
+
+         candidates = [ x for future in futures for x in future.result() ]
+
+   else:
+
+      candidates = [ x for s in starts
+                     for x in sweep_offsets( ciphertext , corpus , s , s + chunk_size , cipher
+                                           , pack , n_candidates ) ]
+
+   ranked_solutions = []
+
+   for score , offset in heapq.nlargest( n_candidates , candidates ):
+
+      key_text = language_model.decode_text( corpus[ "letters" ][ offset : offset + m ] )
+
+      plaintext = decrypt_running_key( ciphertext , key_text , cipher )
+
+      if pack is not None:
+
+         score = language_model.ngram_fitness( plaintext , pack )
+
+      ranked_solutions.append( [ offset , key_text , plaintext , score ] )
+
+   ranked_solutions.sort( key = lambda x : x[ 3 ] , reverse = True )
+
+   return ranked_solutions[ : n_best ]
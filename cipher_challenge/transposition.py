@@ -0,0 +1,258 @@
+# Suite of python procedures to decrypt transposition ciphers
+#
+# >>> from cipher_challenge.transposition import *
+#
+# decrypt_transposition_with_perm( ciphertext 
+#                                , perm 
+#                                , read_by ) -> plaintext
+#
+# E.g. for a write-by-row, read-by-column transposition cipher, use
+# read_by = "column"; for a write-by-row, read-by-row cipher, use
+# read_by = "row".
+#
+# text_to_ncolumn_matrix_by_row( text , n ) -> matrix
+# text_to_ncolumn_matrix_by_column( text , n ) -> matrix
+# depermute_matrix_columns( matrix , perm ) -> depermuted_matrix
+# read_matrix_by_rows( matrix ) -> text
+# remove_spaces( input_text ) -> text
+# reverse_text( text ) -> reversed_text
+# create_matrix_of_zeros( m , n ) -> matrix
+#
+# decrypt_irregular_transposition( ciphertext , perm , read_by ) -> plaintext
+# encrypt_irregular_transposition( plaintext , perm , read_by ) -> ciphertext
+# irregular_decrypt_map( length , perm , read_by ) -> decrypt_map
+#
+# An irregular (or incomplete) columnar transposition writes a text
+# whose length is not a multiple of the key length by rows, leaving
+# the last row short: the first length % n plaintext columns are one
+# letter longer than the rest. The lengths of the cipher columns, and
+# so where each one starts in the ciphertext, depend on the
+# permutation. With read_by = "row", the short last row is read after
+# the full rows, taking the letters of the long columns in cipher
+# column order. When n divides the length these agree with
+# decrypt_transposition_with_perm.
+#
+# Written by Nela Brockington, 8th May 2020, London UK.
+
+
+import functools
+
+from .core import remove_spaces
+
+
+# Procedure to decrypt a transposition cipher with a given encryption
+# permutation and a given "read_by" parameter, which can be "row" or
+# "column": (NB. Any spaces will be removed from the ciphertext in the
+# first step)
+
+def decrypt_transposition_with_perm( ciphertext , perm , read_by ):
+
+   ciphertext = remove_spaces( ciphertext )
+
+   if read_by == "row":
+
+      cipher_matrix = text_to_ncolumn_matrix_by_row( ciphertext , len( perm ) )
+
+   else:
+
+      cipher_matrix = text_to_ncolumn_matrix_by_column( ciphertext , len( perm ) )
+
+   depermuted_matrix = depermute_matrix_columns( cipher_matrix , perm ) 
+
+   plaintext = read_matrix_by_rows( depermuted_matrix )
+
+   return plaintext
+
+
+# Procedure to read characters from a matrix by rows and convert to a
+# string:
+
+def read_matrix_by_rows( matrix ):
+
+   text_list = [ char for row in matrix for char in row ]
+
+   return ''.join( map ( str , text_list ) )
+
+
+# Procedure to depermute a matrix by columns, given the permutation
+# that was used to permute it:
+  
+def depermute_matrix_columns( matrix , perm ):
+
+   inv_perm = [ perm.index( i + 1 ) for i in range( len( perm ) ) ]
+
+   return [ [ row[ i ] for i in inv_perm ] for row in matrix ]
+
+
+# Procedure to construct an n-column matrix row-by-row from a string,
+# treating each row as a list and nesting the rows into a nested list:
+
+def text_to_ncolumn_matrix_by_row( text , n ):
+
+   text = list( text )
+
+   m = len( text ) // n
+
+   return [ text[ i * n : ( i + 1 ) * n ] for i in range( m ) ]
+
+
+# Procedure to construct an n-column matrix column-by-column from a
+# string, by first filling an n-row matrix row-by-row and then
+# transposing it:
+
+def text_to_ncolumn_matrix_by_column( text , n ):
+
+   m = len( text ) // n
+
+   matrix = text_to_ncolumn_matrix_by_row( text , m )
+
+   return [ [ row[ i ] for row in matrix ] for i in range( m ) ]
+
+
+# Procedure to reverse the order of letters in a text:
+
+def reverse_text( text ):
+
+   reversed_list = []
+
+   for c in text:
+
+      reversed_list.insert( 0 , c )
+
+   reversed_text = ''.join( map ( str , reversed_list ) )
+
+   return reversed_text
+
+
+
+# Procedure to create an m-by-n matrix of zeros:
+
+def create_matrix_of_zeros( m , n ):
+
+   mat = []
+
+   row = [ 0 ] * n
+
+   for i in range( m ):
+
+      mat.append( row )
+
+   return mat
+
+
+
+# Procedure to describe where the letters of each cipher column lie in
+# an irregular transposition ciphertext of a given length, given which
+# cipher columns are long (as a tuple of bools). Returns, for each
+# cipher column, ( start , stop , step , extra ): its letters are
+# ciphertext[ start : stop : step ], followed by ciphertext[ extra ]
+# unless extra is None. Only the set of long columns matters, so this
+# is cached and shared by every permutation with the same set:
+
+@functools.lru_cache( maxsize = 4096 )
+def irregular_column_slices( length , long_columns , read_by ):
+
+   n = len( long_columns )
+
+   rows = length // n
+
+   slices = []
+
+   if read_by == "row":
+
+      extra = rows * n
+
+      for c in range( n ):
+
+         slices.append( ( c , rows * n , n , extra if long_columns[ c ] else None ) )
+
+         extra += long_columns[ c ]
+
+   else:
+
+      start = 0
+
+      for c in range( n ):
+
+         stop = start + rows + long_columns[ c ]
+
+         slices.append( ( start , stop , 1 , None ) )
+
+         start = stop
+
+   return tuple( slices )
+
+
+# Procedure to tell which cipher columns of a permutation are long in
+# a text of the given length:
+
+def irregular_long_columns( length , perm ):
+
+   return tuple( p <= length % len( perm ) for p in perm )
+
+
+# Procedure to decrypt a text (a string, or a range of positions) with
+# an irregular transposition: each cipher column is copied whole into
+# its place in the plaintext, every n-th letter:
+
+def gather_irregular_columns( text , perm , read_by ):
+
+   n = len( perm )
+
+   slices = irregular_column_slices( len( text ) , irregular_long_columns( len( text ) , perm )
+                                   , read_by )
+
+   plaintext = [ None ] * len( text )
+
+   for c , ( start , stop , step , extra ) in enumerate( slices ):
+
+      letters = list( text[ start : stop : step ] )
+
+      if extra is not None:
+
+         letters.append( text[ extra ] )
+
+      plaintext[ perm[ c ] - 1 : : n ] = letters
+
+   return plaintext
+
+
+# Procedure to give the decrypt map of an irregular transposition (the
+# ciphertext position of each plaintext letter), cached by text
+# length, permutation and read_by:
+
+@functools.lru_cache( maxsize = 4096 )
+def irregular_decrypt_map( length , perm , read_by ):
+
+   return tuple( gather_irregular_columns( range( length ) , perm , read_by ) )
+
+
+# Procedure to decrypt an irregular transposition cipher with a given
+# encryption permutation: (NB. Any spaces will be removed from the
+# ciphertext in the first step)
+
+def decrypt_irregular_transposition( ciphertext , perm , read_by ):
+
+   ciphertext = remove_spaces( ciphertext )
+
+   decrypt_map = irregular_decrypt_map( len( ciphertext ) , tuple( perm ) , read_by )
+
+   return ''.join( map( ciphertext.__getitem__ , decrypt_map ) )
+
+
+# Procedure to encrypt a plaintext with an irregular transposition,
+# the inverse of decrypt_irregular_transposition:
+
+def encrypt_irregular_transposition( plaintext , perm , read_by ):
+
+   plaintext = remove_spaces( plaintext )
+
+   decrypt_map = irregular_decrypt_map( len( plaintext ) , tuple( perm ) , read_by )
+
+   ciphertext = [ None ] * len( plaintext )
+
+   for p , i in enumerate( decrypt_map ):
+
+      ciphertext[ i ] = plaintext[ p ]
+
+   return ''.join( ciphertext )
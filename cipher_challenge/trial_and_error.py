@@ -1,7 +1,7 @@
 # Suite of python procedures to help implement trial-and-error
 # decryption of ciphertext
 #
-# >>> from trial_and_error import *
+# >>> from cipher_challenge.trial_and_error import *
 #
 # decrypt_with_partial_key( ciphertext , partial_key ) -> plaintext
 # add_substitution_to_key( key , plainchar , cipherchar ) -> new_key
@@ -1,8 +1,9 @@
 # Suite of python procedures to help decrypt a Vigenere cipher
 #
-# >> from vigenere import *
+# >>> from cipher_challenge.vigenere import *
 #
 # decrypt_vigenere( ciphertext , list_of_shifts ) -> plaintext
+# decrypt_vigenere_batch( ciphertext , list_of_shift_lists ) -> plaintexts
 # convert_case( text , to_case ) -> converted_text
 # interleave_substrings( list_of_substrings ) -> text
 # vigenere_suggestions( ciphertext , k ) -> Nothing
@@ -16,11 +17,11 @@
 # Edited by Nela Brockington, 10th May 2020, London UK.
 
 
-# Importing procedures from freq_analysis and crypto_tools modules:
+# Importing procedures from freq_analysis and core modules:
 
-import freq_analysis
+from . import freq_analysis
 
-import crypto_tools
+from .core import remove_spaces
 
 # Alphabet key:
 
@@ -31,58 +32,108 @@ alphabet_key = ([("A", 0), ("B", 1), ("C", 2), ("D", 3), ("E", 4), ("F", 5),
                  ("W", 22), ("X", 23), ("Y", 24), ("Z", 25)])
 
 
-# Procedure to decrypt a Vigenere cipher by applying Caesar decryption
-# to its substrings, given a (potentially partial) list of shifts to
-# use: (NB. Decrypted letters are output in lowercase; use a shift of
-# 26 for no decryption; input ciphertext can have spaces but no
-# punctuation)
+# Procedure to decrypt a Vigenere cipher given a (potentially partial)
+# list of Caesar shifts to use, printing the ciphertext and plaintext:
+# (NB. Decrypted letters are output in lowercase; use a shift of 26
+# for no decryption; spaces and punctuation in the ciphertext are kept
+# in place and do not use up a shift)
 
 def decrypt_vigenere( ciphertext , list_of_shifts ):
 
-   ciphertext = convert_case( ciphertext , "upper" )
+   plaintext = decrypt_vigenere_batch( ciphertext , [ list_of_shifts ] )[ 0 ]
 
-   k = len( list_of_shifts )
+   print( "\n" + convert_case( ciphertext , "upper" ) )
 
-   plain_substrings = []
+   print( "\n" + plaintext )
 
-   for m in range( k ):
+   return plaintext
 
-      cipher_substring = extract_substring_m_mod_k( ciphertext , m , k )
 
-      if list_of_shifts[ m ] == 26:
+# The letters decrypted by decrypt_vigenere_batch (all other characters
+# are kept as they are):
 
-         plain_substrings.append( cipher_substring )
+uppercase_letters = frozenset( "ABCDEFGHIJKLMNOPQRSTUVWXYZ" )
 
-      else:
 
-         plain_substring = crypto_tools.decrypt_caesar( cipher_substring 
-                                                   , list_of_shifts[ m ] )
+# Translation tables from uppercase ciphertext letters to lowercase
+# plaintext letters under each Caesar shift 0-25, with shift 26 leaving
+# letters as they are:
+
+vigenere_shift_tables = ( [ bytes.maketrans( bytes( range( 65 , 91 ) )
+                                           , bytes( 97 + ( c - s ) % 26
+                                                    for c in range( 26 ) ) )
+                            for s in range( 26 ) ]
+                          + [ bytes.maketrans( b"" , b"" ) ] )
+
+
+# Procedure to decrypt a Vigenere ciphertext under each of a batch of
+# lists of shifts (which may have different lengths), in the same way
+# as decrypt_vigenere but without printing, returning the list of
+# plaintexts. The letters under each key position are decrypted in one
+# step for every shift they are given in the batch, and each plaintext
+# is then reassembled in one pass, with the spaces and punctuation
+# (any character but A-Z, copied through unchanged) restored from a
+# map of their positions:
+
+def decrypt_vigenere_batch( ciphertext , list_of_shift_lists ):
+
+   text = convert_case( ciphertext , "upper" )
 
-         plain_substrings.append( convert_case( plain_substring , "lower" ) )
+   letters = ''.join( c for c in text if c in uppercase_letters ).encode( "ascii" )
 
-   plaintext_list = []
+   others = [ c for c in text if c not in uppercase_letters ]
 
-   count = 0
+   # Position map: the index of each character of the text in the
+   # decrypted letters followed by the other characters:
 
-   for c in ciphertext:
+   position_map = []
 
-      if c == ' ':
+   n_letters = 0
 
-         plaintext_list.append( c )
+   n_others = 0
+
+   for c in text:
+
+      if c in uppercase_letters:
+
+         position_map.append( n_letters )
+
+         n_letters += 1
 
       else:
 
-         plaintext_list.append( plain_substrings[ count % k][ count // k ] )
+         position_map.append( len( letters ) + n_others )
 
-         count += 1
+         n_others += 1
 
-   plaintext = ''.join( plaintext_list )
+   decrypted_columns = {}
 
-   print( "\n" + ciphertext )
+   plaintexts = []
 
-   print( "\n" + plaintext )
+   for list_of_shifts in list_of_shift_lists:
 
-   return plaintext
+      k = len( list_of_shifts )
+
+      decrypted = bytearray( len( letters ) )
+
+      for m in range( k ):
+
+         # Any shift but 26 is taken mod 26, as by decrypt_caesar:
+
+         shift = list_of_shifts[ m ] if list_of_shifts[ m ] == 26 else list_of_shifts[ m ] % 26
+
+         if ( k , m , shift ) not in decrypted_columns:
+
+            decrypted_columns[ ( k , m , shift ) ] = ( letters[ m : : k ].translate(
+                                                         vigenere_shift_tables[ shift ] ) )
+
+         decrypted[ m : : k ] = decrypted_columns[ ( k , m , shift ) ]
+
+      characters = list( decrypted.decode( "ascii" ) ) + others
+
+      plaintexts.append( ''.join( map( characters.__getitem__ , position_map ) ) )
+
+   return plaintexts
 
 
 
@@ -214,18 +265,3 @@ def calculate_ioc( text ):
                    * ( text.count( chr( i ) ) - 1 ) )
                    / ( n * ( n - 1 ) ) ) 
                  for i in range( 65 , 91 ) ] )
-
-
-# Procedure to remove spaces in a text:
-
-def remove_spaces( input_text ):
-
-   text_list = []
-
-   for c in input_text:
-
-      if c != ' ':
-
-         text_list.append( c )
-
-   return ''.join( map ( str , text_list ) )